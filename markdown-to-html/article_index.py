@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+文章库元数据索引
+
+功能：为 Markdown 文章库建立 SQLite 元数据索引
+- 只读取文件头部的 frontmatter，不读取正文
+- 按 路径 + mtime + 大小 增量更新，未变化的文件不重新读取
+- 已删除的文件自动移出索引
+- 支持按标题/作者/关键字查询，输出表格或 JSON
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+from markdown_to_html import read_frontmatter_header
+
+DEFAULT_DB = "/root/.openclaw/workspace/.cache/article_index.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    path       TEXT PRIMARY KEY,
+    mtime_ns   INTEGER NOT NULL,
+    size       INTEGER NOT NULL,
+    title      TEXT,
+    author     TEXT,
+    meta       TEXT,
+    indexed_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_articles_author ON articles(author);
+"""
+
+
+def open_index(db_path: str) -> sqlite3.Connection:
+    """打开（必要时创建）索引数据库"""
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def iter_markdown_files(root: str):
+    """递归遍历目录下的 .md 文件，产出 (路径, stat)"""
+    stack = [root]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if not entry.name.startswith('.'):
+                        stack.append(entry.path)
+                elif entry.name.endswith('.md') and entry.is_file():
+                    yield entry.path, entry.stat()
+
+
+def _like_escape(value: str) -> str:
+    """转义 LIKE 通配符，配合 ESCAPE '\\' 使用"""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def update_index(conn: sqlite3.Connection, root: str) -> dict:
+    """增量更新索引，返回统计信息"""
+    root = os.path.abspath(root)
+    known = {
+        path: (mtime_ns, size)
+        for path, mtime_ns, size in conn.execute(
+            "SELECT path, mtime_ns, size FROM articles WHERE path LIKE ? ESCAPE '\\'",
+            (_like_escape(root) + os.sep + '%',)
+        )
+    }
+    stats = {"scanned": 0, "updated": 0, "unchanged": 0, "removed": 0}
+    now = time.time()
+    rows = []
+
+    for path, st in iter_markdown_files(root):
+        stats["scanned"] += 1
+        if known.pop(path, None) == (st.st_mtime_ns, st.st_size):
+            stats["unchanged"] += 1
+            continue
+        try:
+            meta = read_frontmatter_header(path)
+        except OSError as e:
+            print(f"⚠️ 读取失败: {path}: {e}", file=sys.stderr)
+            continue
+        rows.append((path, st.st_mtime_ns, st.st_size, meta.get('title', ''), meta.get('author', ''),
+                     json.dumps(meta, ensure_ascii=False), now))
+
+    with conn:
+        conn.executemany("INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        conn.executemany("DELETE FROM articles WHERE path = ?", [(p,) for p in known])
+    stats["updated"] = len(rows)
+    stats["removed"] = len(known)
+    return stats
+
+
+def query_index(conn: sqlite3.Connection, keyword: str = None, author: str = None,
+                limit: int = None) -> list:
+    """查询索引：keyword 匹配标题和 frontmatter，author 精确匹配"""
+    sql = "SELECT path, title, author, meta, mtime_ns, size FROM articles"
+    where, params = [], []
+    if keyword:
+        where.append("(title LIKE ? ESCAPE '\\' OR meta LIKE ? ESCAPE '\\')")
+        pattern = f"%{_like_escape(keyword)}%"
+        params += [pattern, pattern]
+    if author:
+        where.append("author = ?")
+        params.append(author)
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY mtime_ns DESC"
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+
+    return [
+        {"path": path, "title": title, "author": author, "meta": json.loads(meta or '{}'),
+         "mtime": mtime_ns / 1e9, "size": size}
+        for path, title, author, meta, mtime_ns, size in conn.execute(sql, params)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='文章库元数据索引')
+    parser.add_argument('--db', default=DEFAULT_DB, help=f'索引数据库路径（默认 {DEFAULT_DB}）')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_update = sub.add_parser('update', help='扫描目录并增量更新索引')
+    p_update.add_argument('root', help='文章库目录')
+
+    p_list = sub.add_parser('list', help='列出/搜索文章')
+    p_list.add_argument('keyword', nargs='?', default=None, help='标题或 frontmatter 关键字')
+    p_list.add_argument('-a', '--author', default=None, help='按作者过滤')
+    p_list.add_argument('-n', '--limit', type=int, default=None, help='最多返回条数')
+    p_list.add_argument('--update', metavar='ROOT', default=None, help='查询前先增量更新该目录')
+    p_list.add_argument('--json', action='store_true', help='输出 JSON 格式')
+
+    args = parser.parse_args()
+    conn = open_index(args.db)
+
+    if args.command == 'update':
+        start = time.perf_counter()
+        stats = update_index(conn, args.root)
+        print(f"✅ 索引已更新: 扫描 {stats['scanned']}，更新 {stats['updated']}，"
+              f"未变 {stats['unchanged']}，移除 {stats['removed']}（{time.perf_counter() - start:.2f}s）")
+        return
+
+    if args.update:
+        update_index(conn, args.update)
+    rows = query_index(conn, args.keyword, args.author, args.limit)
+
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+        return
+    for row in rows:
+        print(f"{row['title'] or '(无标题)'}\t{row['author']}\t{row['path']}")
+    print(f"📚 共 {len(rows)} 篇")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+中文排版规范化
+
+功能：在渲染前对 Markdown 文本做一次排版清理（围栏/缩进代码块、行内代码、链接地址、HTML 标签不受影响）
+- 全角英文字母、数字 → 半角（str.translate 查表）
+- 中文与英文/数字之间补空格
+- 中文后的半角标点 ,.!?;: → 全角（!? 连续串整体转换，其后的空格删除）；英文之间的全角标点 → 半角加空格
+- 连续的 ！！！/？？？ 合并为一个；中文与全角标点之间多余的空格删除
+
+除查表外，所有规则合并在一个正则扫描中完成，每段文本只遍历一次。
+全角字母数字很少见，只对出现的片段查表，不对整段非 ASCII 文本做 translate。
+
+用法：
+    python cjk_typography.py article.md            # 输出规范化后的文本
+    python cjk_typography.py bench article.md      # 与逐条 re.sub 对比耗时
+    python cjk_typography.py bench                 # 用内置样例对比
+"""
+
+import re
+import sys
+import time
+from pathlib import Path
+
+# 全角 ASCII 字母、数字 → 半角
+FULLWIDTH_ALNUM = {
+    **{0xFF10 + i: 0x30 + i for i in range(10)},
+    **{0xFF21 + i: 0x41 + i for i in range(26)},
+    **{0xFF41 + i: 0x61 + i for i in range(26)},
+}
+TRANSLATE_TABLE = str.maketrans(FULLWIDTH_ALNUM)
+# 查表替换对整段非 ASCII 文本较慢，只对找到的全角片段查表
+FULLWIDTH_ALNUM_RE = re.compile('[０-９Ａ-Ｚａ-ｚ]+')
+
+# 中文后的半角标点 → 全角
+TO_FULLWIDTH = {',': '，', '.': '。', '!': '！', '?': '？', ';': '；', ':': '：'}
+# 英文之间的全角标点 → 半角
+TO_HALFWIDTH = {'，': ',', '；': ';', '：': ':', '！': '!', '？': '?'}
+
+CJK = r'㐀-䶿一-鿿豈-﫿'
+FULLWIDTH_PUNCT = '，。！？：；、'
+
+# 开头的前瞻字符集让引擎快速跳过连续的中文；各分支以各自的候选字符开头，上下文放在已消费字符之后的定宽断言里。
+# 分支不带标记分组（标记分组会拖慢每个候选位置），由 _replace 按匹配的首字符判断规则
+TYPOGRAPHY_RE = re.compile(
+    rf'(?=[A-Za-z0-9,.;:!?！？，；： \t])(?:'
+    rf'[A-Za-z0-9](?:(?<=[{CJK}].)|(?=[{CJK}]))'              # 中文|英文、英文|中文
+    rf'|[,;:](?<=[{CJK}].)[ \t]*'                             # 中文后的 ,;:（连同其后空格）
+    rf'|\.(?<=[{CJK}].)(?:[ \t]+|(?=\s|$|[{CJK}]))'           # 中文后的句号（连同其后空格）
+    rf'|[!?](?<=[{CJK}].)[!?]*[ \t]*'                          # 中文后的 !/? 连续串（连同其后空格）
+    rf'|[ \t](?<=[{CJK}].)[ \t]*(?=[{FULLWIDTH_PUNCT}])'       # 中文与全角标点间的空格
+    rf'|([！？])\1+'                                           # ！！！ → ！
+    rf'|[，；：！？](?<=[A-Za-z].)(?=[A-Za-z])'                  # 英文之间的全角标点
+    rf')'
+)
+
+# 不处理的片段：围栏代码块（未闭合时到文末）、缩进代码块（空行后缩进 4 空格或 Tab 的连续行）、
+# 行内代码、链接地址、HTML 标签/自动链接、裸 URL。块级片段连同前面的换行一起匹配（调用方在文首补一个换行），
+# 所有分支都以具体字符开头，引擎可按字符集前缀跳过正文
+PROTECTED_RE = re.compile(
+    r'\n {0,3}(?:'
+    r'(`{3,})[^\n]*(?:\n(?! {0,3}\1`*[ \t]*(?:\n|\Z))[^\n]*)*(?:\n {0,3}\1`*[ \t]*(?=\n|\Z))?'
+    r'|(~{3,})[^\n]*(?:\n(?! {0,3}\2~*[ \t]*(?:\n|\Z))[^\n]*)*(?:\n {0,3}\2~*[ \t]*(?=\n|\Z))?)'
+    r'|\n[ \t]*\n(?: {4}|\t)[^\n]*(?:\n(?:(?: {4}|\t)[^\n]*|[ \t]*(?=\n)))*'
+    r'|`+[^`\n]*`+|\]\([^()\[\]\n]*\)|<[^<>\n]*>|https?://[^\s<>()]+'
+)
+
+
+def _full_marks(marks: str) -> str:
+    """!/? 串转全角，相邻的相同标点合并：!!! → ！，!? → ！？"""
+    out = []
+    for mark in marks:
+        mark = TO_FULLWIDTH[mark]
+        if not out or out[-1] != mark:
+            out.append(mark)
+    return ''.join(out)
+
+
+def _is_cjk(char: str) -> bool:
+    return '㐀' <= char <= '䶿' or '一' <= char <= '鿿' or '豈' <= char <= '﫿'
+
+
+def _replace(match) -> str:
+    text = match.group()
+    char = text[0]
+    if char.isascii() and char.isalnum():
+        string, start = match.string, match.start()
+        lead = start > 0 and _is_cjk(string[start - 1])
+        tail = start + 1 < len(string) and _is_cjk(string[start + 1])
+        return (' ' if lead else '') + char + (' ' if tail else '')
+    if char in ',;:':
+        return TO_FULLWIDTH[char]
+    if char == '.':
+        return '。'
+    if char in '!?':
+        marks = text.rstrip(' \t')
+        # ![ 是图片语法：末尾的 ! 保持原样（其后没有空格）
+        if marks[-1] == '!' and match.string.startswith('[', match.end()):
+            return _full_marks(marks[:-1]) + '!' if len(marks) > 1 else marks
+        return _full_marks(marks)
+    if char in ' \t':
+        return ''
+    if len(text) > 1:
+        return char
+    return TO_HALFWIDTH[char] + ' '
+
+
+def _halfwidth(match) -> str:
+    return match.group().translate(TRANSLATE_TABLE)
+
+
+def _normalize_segment(text: str) -> str:
+    text = FULLWIDTH_ALNUM_RE.sub(_halfwidth, text)
+    return TYPOGRAPHY_RE.sub(_replace, text)
+
+
+def _normalize_text(text: str) -> str:
+    """规范化一段 Markdown 文本，受保护片段（含其中的全角字符）原样保留"""
+    if '`' not in text and '~~~' not in text and '](' not in text and '<' not in text and '://' not in text \
+            and '    ' not in text and '\t' not in text:
+        return _normalize_segment(text)
+
+    # 文首补一个空行，使文首的代码块也能按块级规则匹配；结果去掉补上的两个换行
+    text = '\n\n' + text
+    out, pos = [], 0
+    for match in PROTECTED_RE.finditer(text):
+        start = match.start()
+        if start > pos:
+            segment = text[pos:start]
+            out.append(segment if segment.isascii() else _normalize_segment(segment))
+        out.append(match.group())
+        pos = match.end()
+    segment = text[pos:]
+    out.append(segment if segment.isascii() else _normalize_segment(segment))
+    return ''.join(out)[2:]
+
+
+def normalize_typography(markdown_text: str) -> str:
+    """规范化 Markdown 的中文排版，代码块与 frontmatter 原样保留"""
+    if markdown_text.isascii():
+        return markdown_text
+
+    # frontmatter 原样保留
+    if markdown_text.startswith('---\n'):
+        end = markdown_text.find('\n---\n', 3)
+        if end == -1 and markdown_text.endswith('\n---'):
+            end = len(markdown_text) - 4
+        if end != -1:
+            split = end + 4
+            return markdown_text[:split] + _normalize_text(markdown_text[split:])
+    return _normalize_text(markdown_text)
+
+
+# 规则样例（输入, 期望输出）：bench 时逐条核对，也用作回归测试
+TYPOGRAPHY_CASES = [
+    ('使用Python开发', '使用 Python 开发'),
+    ('第３章ＧＰＵ加速', '第 3 章 GPU 加速'),
+    ('效果很好,速度也快.', '效果很好，速度也快。'),
+    ('真的吗!?', '真的吗！？'),
+    ('太好了!!! 下一步', '太好了！下一步'),
+    ('结束了. 下一句', '结束了。下一句'),
+    ('注意:  先备份', '注意：先备份'),
+    ('太好了！！！', '太好了！'),
+    ('中文 ，标点', '中文，标点'),
+    ('Hello，world', 'Hello, world'),
+    ('见下图![示意图](a.png)', '见下图![示意图](a.png)'),
+    ('运行 `ｐｉｐ install中文` 即可', '运行 `ｐｉｐ install中文` 即可'),
+    ('[文档](https://example.com/ａ中b)', '[文档](https://example.com/ａ中b)'),
+    ('```\n中文abc,\n```\n中文abc', '```\n中文abc,\n```\n中文 abc'),
+    ('正文\n\n    缩进代码abc中文\n\n正文abc', '正文\n\n    缩进代码abc中文\n\n正文 abc'),
+]
+
+# bench 未指定文件时的内置样例：以中文为主、夹杂英文术语、代码和链接的常见文章，约 1.3 万字
+BENCH_PARAGRAPHS = [
+    '大模型应用落地的过程中，检索增强生成已经成为最常见的架构之一。它把外部知识库和模型的推理能力结合起来，'
+    '在不重新训练模型的前提下提升回答的准确性，也让知识的更新变得更加及时和可控。',
+    '在使用Python开发Web服务时,我们通常会选择FastAPI或者Django框架.它们各有优劣!?',
+    '上下文窗口从4K扩展到了128K，这让RAG的设计发生了很大变化。 ，很多团队开始重新评估切分策略。',
+    '运行 `pip install numpy` 之后，再参考[官方文档](https://numpy.org/doc/stable/)即可。',
+    '这个问题真的很难吗？？？其实只要理解了注意力机制就好了!!! 接下来我们看具体实现.',
+    '- 第一步：准备数据集，包括训练集和测试集两部分\n- 第二步：设置 batch size 和学习率，开始训练',
+    '## 性能优化实践',
+    '在生产环境里，我们把每秒请求数提升到了原来的七倍多，尾部延迟降低了六成左右。这主要得益于缓存和批处理，'
+    '以及对热点数据的预取。整个过程没有改动业务逻辑，只调整了数据访问的方式和部署的拓扑结构。',
+    '```python\nprint("你好,world")\n```',
+]
+
+
+def bench_sample(size: int = 13000) -> str:
+    parts = [case for case, _ in TYPOGRAPHY_CASES]
+    i = 0
+    while sum(map(len, parts)) < size:
+        parts.append(BENCH_PARAGRAPHS[i % len(BENCH_PARAGRAPHS)])
+        i += 1
+    return '\n\n'.join(parts)
+
+
+def _adhoc_marks(match) -> str:
+    marks = match.group(1)
+    if marks[-1] == '!' and match.string.startswith('[', match.end()):
+        return _full_marks(marks[:-1]) + '!' if len(marks) > 1 else marks
+    return _full_marks(marks)
+
+
+# 对照组：同样的规则逐条用 re.sub 做（每条规则一次全文遍历，也不区分代码）
+ADHOC_RULES = [
+    (re.compile('[０-９Ａ-Ｚａ-ｚ]'), lambda m: chr(ord(m.group()) - 0xFEE0)),
+    (re.compile(r'([！？])\1+'), r'\1'),
+    (re.compile(rf'(?<=[{CJK}])([!?]+)[ \t]*'), _adhoc_marks),
+    (re.compile(rf'(?<=[{CJK}])([,;:]|\.(?=\s|$|[{CJK}]))[ \t]*'), lambda m: TO_FULLWIDTH[m.group(1)]),
+    (re.compile(rf'(?<=[{CJK}])[ \t]+(?=[{FULLWIDTH_PUNCT}])'), ''),
+    (re.compile(r'(?<=[A-Za-z])([，；：！？])(?=[A-Za-z])'), lambda m: TO_HALFWIDTH[m.group(1)] + ' '),
+    (re.compile(rf'([{CJK}])([A-Za-z0-9])'), r'\1 \2'),
+    (re.compile(rf'([A-Za-z0-9])([{CJK}])'), r'\1 \2'),
+]
+
+
+def _adhoc(text: str) -> str:
+    for pattern, repl in ADHOC_RULES:
+        text = pattern.sub(repl, text)
+    return text
+
+
+def _best_ms(func, rounds: int, repeat: int = 5) -> float:
+    """重复 repeat 组、每组 rounds 次，取最快一组的单次耗时（毫秒），减少计时噪声"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            func()
+        elapsed = (time.perf_counter() - start) / rounds * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def benchmark(text: str, rounds: int = 50) -> dict:
+    """对比：规范化一次 vs 逐条 re.sub（单位毫秒）
+
+    per_pass_ms 为各条规则单独一次 re.sub 的平均耗时，min_pass_ms 为其中最快的一条
+    """
+    passes = [_best_ms(lambda p=pattern, r=repl: p.sub(r, text), rounds) for pattern, repl in ADHOC_RULES]
+    return {
+        'normalize_ms': _best_ms(lambda: normalize_typography(text), rounds),
+        'adhoc_ms': _best_ms(lambda: _adhoc(text), rounds),
+        'per_pass_ms': sum(passes) / len(passes),
+        'min_pass_ms': min(passes),
+    }
+
+
+def check_cases() -> list:
+    """核对规则样例，返回不符合的 [(输入, 期望, 实际)]"""
+    failures = []
+    for text, expected in TYPOGRAPHY_CASES:
+        actual = normalize_typography(text)
+        if actual != expected:
+            failures.append((text, expected, actual))
+    return failures
+
+
+def main():
+    args = sys.argv[1:]
+    if not args:
+        print("用法: python cjk_typography.py <Markdown 文件> | bench [Markdown 文件]")
+        sys.exit(1)
+
+    if args[0] == 'bench':
+        text = Path(args[1]).read_text(encoding='utf-8') if len(args) > 1 else bench_sample()
+        failures = check_cases()
+        for case, expected, actual in failures:
+            print(f"❌ {case!r}: 期望 {expected!r}，实际 {actual!r}")
+        print(f"{'✅' if not failures else '⚠️'} 规则样例 {len(TYPOGRAPHY_CASES) - len(failures)}/{len(TYPOGRAPHY_CASES)} 通过")
+        result = benchmark(text)
+        print(f"📝 {len(text)} 字符{'' if len(args) > 1 else '（内置样例）'}")
+        print(f"⏱️ 排版规范化: {result['normalize_ms']:.3f} ms")
+        print(f"⏱️ 逐条 re.sub（{len(ADHOC_RULES)} 条）: {result['adhoc_ms']:.3f} ms，"
+              f"平均每条 {result['per_pass_ms']:.3f} ms，最快一条 {result['min_pass_ms']:.3f} ms")
+        if failures:
+            sys.exit(1)
+        return
+
+    path = Path(args[0])
+    if not path.exists():
+        print(f"❌ 文件不存在: {path}")
+        sys.exit(1)
+    sys.stdout.write(normalize_typography(path.read_text(encoding='utf-8')))
+
+
+if __name__ == "__main__":
+    main()
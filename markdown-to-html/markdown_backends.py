@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Markdown 解析后端
+
+功能：为 markdown-to-html 提供可切换的 Markdown 解析器
+- python-markdown（默认）、markdown-it（markdown-it-py）、mistune
+- 各后端统一配置：表格、围栏代码块（语言类名无前缀）、脚注；警告框由 render_body 统一后处理
+- 一致性检查：同一组语料在各后端的输出归一化后逐一比较
+- 基准测试：在通过一致性检查的后端中选出最快的，保存为 auto 的默认选择
+
+用法：
+    python markdown_backends.py check            # 一致性检查，不通过时返回非 0
+    python markdown_backends.py bench --save     # 基准测试并保存最快的可用后端
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from functools import lru_cache
+from html import escape
+from html.parser import HTMLParser
+from pathlib import Path
+
+DEFAULT_BACKEND = 'python-markdown'
+
+# bench --save 保存的选择；--backend auto 时读取
+BACKEND_CHOICE_FILE = Path(os.environ.get(
+    'MD2HTML_BACKEND_FILE', '/root/.openclaw/workspace/.cache/md_backend.json'
+))
+
+BACKENDS = {}
+# 保存的选择按文件修改时间缓存：(mtime_ns, 后端名)，流式渲染每个块都会解析后端
+_saved_choice = (None, None)
+
+
+class BackendUnavailable(Exception):
+    """后端依赖未安装"""
+
+
+def register_backend(name: str):
+    """注册后端：被装饰函数返回 convert(text) -> html"""
+    def decorator(factory):
+        BACKENDS[name] = factory
+        return factory
+    return decorator
+
+
+@register_backend('python-markdown')
+def _python_markdown():
+    import markdown
+
+    def convert(text: str) -> str:
+        md = markdown.Markdown(
+            extensions=['tables', 'fenced_code', 'footnotes'],
+            extension_configs={
+                'fenced_code': {'lang_prefix': ''},
+            }
+        )
+        return md.convert(text)
+
+    return convert
+
+
+@register_backend('markdown-it')
+def _markdown_it():
+    from markdown_it import MarkdownIt
+    from mdit_py_plugins.footnote import footnote_plugin
+
+    md = MarkdownIt('commonmark', {'html': True, 'langPrefix': ''}).enable('table').use(footnote_plugin)
+    return md.render
+
+
+@register_backend('mistune')
+def _mistune():
+    import mistune
+
+    class Renderer(mistune.HTMLRenderer):
+        def block_code(self, code, info=None):
+            lang = info.split()[0] if info else ''
+            attr = f' class="{escape(lang)}"' if lang else ''
+            return f'<pre><code{attr}>{escape(code)}</code></pre>\n'
+
+    return mistune.create_markdown(renderer=Renderer(escape=False), plugins=['table', 'footnotes'])
+
+
+@lru_cache(maxsize=None)
+def get_converter(name: str):
+    """获取后端的转换函数（每个后端只初始化一次）"""
+    if name not in BACKENDS:
+        raise ValueError(f"未知的 Markdown 后端: {name}（可选: {', '.join(BACKENDS)}）")
+    try:
+        return BACKENDS[name]()
+    except ImportError as e:
+        raise BackendUnavailable(f"{name} 未安装: {e}") from e
+
+
+def available_backends() -> list:
+    """已安装依赖、可用的后端"""
+    names = []
+    for name in BACKENDS:
+        try:
+            get_converter(name)
+            names.append(name)
+        except BackendUnavailable:
+            pass
+    return names
+
+
+def resolve_backend(name: str = None) -> str:
+    """解析后端名：auto/空 → MD2HTML_BACKEND 环境变量 → bench 保存的选择 → 默认后端"""
+    if name and name != 'auto':
+        return name
+    env = os.environ.get('MD2HTML_BACKEND')
+    if env and env != 'auto':
+        return env
+    return _saved_backend() or DEFAULT_BACKEND
+
+
+def _saved_backend() -> str:
+    """bench --save 保存的后端；文件未变化时直接用缓存，已保存但未安装的后端视为没有保存"""
+    global _saved_choice
+    try:
+        mtime = BACKEND_CHOICE_FILE.stat().st_mtime_ns
+    except OSError:
+        return None
+    if _saved_choice[0] == mtime:
+        return _saved_choice[1]
+    try:
+        saved = json.loads(BACKEND_CHOICE_FILE.read_text(encoding='utf-8')).get('backend')
+    except (OSError, ValueError, AttributeError):
+        saved = None
+    if saved not in available_backends():
+        saved = None
+    _saved_choice = (mtime, saved)
+    return saved
+
+
+# ---- 一致性检查 ----
+
+PARITY_CORPUS = {
+    'heading': "# 一级标题\n\n## 二级标题\n\n### 三级标题\n\n正文段落。",
+    'emphasis': "这是 **加粗**、*斜体* 和 `行内代码`，以及 [链接](https://example.com)。",
+    'paragraphs': "第一段第一行\n第一段第二行\n\n第二段。",
+    'unordered_list': "- 第一项\n- 第二项\n- 第三项",
+    'ordered_list': "1. 步骤一\n2. 步骤二\n3. 步骤三",
+    'nested_list': "- 父项\n    - 子项一\n    - 子项二\n- 另一父项",
+    'table': "| 名称 | 说明 |\n|------|------|\n| A | 第一行 |\n| B | 第二行 |",
+    'table_align': "| 左 | 中 | 右 |\n|:---|:---:|---:|\n| 1 | 2 | 3 |",
+    'fenced_code': "```python\ndef hello():\n    return '<b>&</b>'\n```",
+    'fenced_code_plain': "```\nplain text\n```",
+    'blockquote': "> 引用内容\n> 第二行",
+    'alert': "> [!NOTE]\n> 这是一条提示。",
+    'footnote': "正文带脚注[^1]。\n\n[^1]: 脚注内容。",
+    'hr': "上文\n\n---\n\n下文",
+    'image': "![示意图](https://example.com/a.png)",
+    'escape': "比较 a < b && c > d 的情况",
+    'ascii_diagram': "```\n+------+     +------+\n| 用户 | --> | 服务 |\n+------+     +------+\n```",
+}
+
+
+class _Normalizer(HTMLParser):
+    """把 HTML 归一化为 (类型, 内容) 序列，忽略各后端无关紧要的差异
+
+    - 空白折叠（<pre> 内保留）
+    - 列表项内的 <p> 忽略（紧凑/松散列表差异）
+    - 脚注引用只记为 sup，脚注区只比较文字
+    - 表格对齐统一为 align
+    """
+
+    KEEP_ATTRS = {'a': ('href',), 'img': ('src', 'alt'), 'code': ('class',)}
+    VOID = {'br', 'hr', 'img'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.tokens = []
+        self.stack = []
+        self.text = []
+        self.skip_depth = 0       # <sup> 内部
+        self.footnote_depth = 0   # 脚注区内部
+        self.pre_depth = 0
+
+    def _flush(self):
+        if not self.text:
+            return
+        text = ''.join(self.text)
+        self.text = []
+        if self.pre_depth:
+            text = text.rstrip('\n')
+        else:
+            text = ' '.join(text.split())
+        if text:
+            self.tokens.append(('text', text))
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if self.footnote_depth:
+            if tag not in self.VOID:
+                self.footnote_depth += 1
+            return
+        if self.skip_depth:
+            if tag not in self.VOID:
+                self.skip_depth += 1
+            return
+        self._flush()
+        if tag == 'hr' and 'footnotes-sep' in (attrs.get('class') or ''):
+            return
+        if tag == 'sup':
+            self.skip_depth = 1
+            self.tokens.append(('sup', ''))
+            return
+        classes = (attrs.get('class') or '').split()
+        if tag in ('div', 'section') and ('footnote' in classes or 'footnotes' in classes):
+            self.footnote_depth = 1
+            self.tokens.append(('footnotes', ''))
+            return
+        if tag == 'p' and self.stack and self.stack[-1] == 'li':
+            self.stack.append('p-in-li')
+            return
+        if tag == 'pre':
+            self.pre_depth += 1
+
+        kept = [(k, attrs.get(k) or '') for k in self.KEEP_ATTRS.get(tag, ()) if attrs.get(k)]
+        style = (attrs.get('style') or '').replace(' ', '')
+        align = attrs.get('align') or (style.split('text-align:', 1)[1].rstrip(';') if 'text-align:' in style else '')
+        if align:
+            kept.append(('align', align))
+        self.tokens.append(('start', tag + ''.join(f' {k}={v}' for k, v in kept)))
+        if tag not in self.VOID:
+            self.stack.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if tag in self.VOID:
+            return
+        if self.footnote_depth:
+            self.footnote_depth -= 1
+            return
+        if self.skip_depth:
+            self.skip_depth -= 1
+            return
+        self._flush()
+        if not self.stack:
+            return
+        opened = self.stack.pop()
+        if opened == 'p-in-li':
+            return
+        if opened == 'pre':
+            self.pre_depth -= 1
+        self.tokens.append(('end', opened))
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        if self.footnote_depth:
+            data = data.replace('↩', '').replace('\ufe0e', '')
+            if data.strip():
+                self.tokens.append(('footnote-text', ' '.join(data.split())))
+            return
+        self.text.append(data)
+
+    def close(self):
+        super().close()
+        self._flush()
+        # 脚注区文字合并为一条
+        merged = []
+        for kind, value in self.tokens:
+            if kind == 'footnote-text' and merged and merged[-1][0] == 'footnote-text':
+                merged[-1] = (kind, merged[-1][1] + value)
+            else:
+                merged.append((kind, value))
+        self.tokens = merged
+
+
+def normalize_html(html: str) -> list:
+    """归一化 HTML，用于跨后端比较"""
+    parser = _Normalizer()
+    parser.feed(html)
+    parser.close()
+    return parser.tokens
+
+
+def check_parity(backends: list = None, reference: str = DEFAULT_BACKEND, postprocess=None) -> dict:
+    """用语料比较各后端与参考后端的归一化输出
+
+    返回 {后端名: [不一致的语料名, ...]}，空列表表示完全一致
+    """
+    postprocess = postprocess or (lambda html: html)
+    ref_convert = get_converter(reference)
+    expected = {name: normalize_html(postprocess(ref_convert(text))) for name, text in PARITY_CORPUS.items()}
+
+    report = {}
+    for backend in backends or available_backends():
+        convert = get_converter(backend)
+        report[backend] = [
+            name for name, text in PARITY_CORPUS.items()
+            if normalize_html(postprocess(convert(text))) != expected[name]
+        ]
+    return report
+
+
+def benchmark(backends: list = None, rounds: int = 20) -> dict:
+    """对整份语料（拼成一篇长文）测量各后端的平均渲染耗时（毫秒）"""
+    article = '\n\n'.join(PARITY_CORPUS.values()) * 5
+    timings = {}
+    for backend in backends or available_backends():
+        convert = get_converter(backend)
+        convert(article)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            convert(article)
+        timings[backend] = (time.perf_counter() - start) / rounds * 1000
+    return timings
+
+
+def select_fastest(postprocess=None, rounds: int = 20) -> tuple:
+    """选出通过一致性检查的最快后端，返回 (后端名, 一致性报告, 耗时)"""
+    parity = check_parity(postprocess=postprocess)
+    passing = [name for name, failures in parity.items() if not failures]
+    timings = benchmark(passing, rounds)
+    best = min(timings, key=timings.get) if timings else DEFAULT_BACKEND
+    return best, parity, timings
+
+
+def _load_postprocess():
+    """一致性检查使用与 render_body 相同的后处理（警告框等）"""
+    try:
+        from markdown_to_html import convert_alerts
+        return convert_alerts
+    except ImportError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Markdown 解析后端一致性检查与基准测试')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_check = sub.add_parser('check', help='比较各后端输出与参考后端是否一致')
+    p_check.add_argument('--reference', default=DEFAULT_BACKEND, help=f'参考后端（默认 {DEFAULT_BACKEND}）')
+    p_check.add_argument('-v', '--verbose', action='store_true', help='显示不一致语料的归一化差异')
+
+    p_bench = sub.add_parser('bench', help='基准测试，选出通过一致性检查的最快后端')
+    p_bench.add_argument('--rounds', type=int, default=20, help='每个后端的渲染轮数')
+    p_bench.add_argument('--save', action='store_true', help=f'保存选择到 {BACKEND_CHOICE_FILE}')
+
+    args = parser.parse_args()
+    postprocess = _load_postprocess()
+    print(f"📦 可用后端: {', '.join(available_backends())}")
+
+    if args.command == 'check':
+        report = check_parity(reference=args.reference, postprocess=postprocess)
+        failed = False
+        for backend, failures in report.items():
+            if failures:
+                failed = True
+                print(f"❌ {backend}: {len(failures)} 项不一致 ({', '.join(failures)})")
+                if args.verbose:
+                    for name in failures:
+                        text = PARITY_CORPUS[name]
+                        pp = postprocess or (lambda html: html)
+                        print(f"   [{name}] 参考: {normalize_html(pp(get_converter(args.reference)(text)))}")
+                        print(f"   [{name}] 实际: {normalize_html(pp(get_converter(backend)(text)))}")
+            else:
+                print(f"✅ {backend}: {len(PARITY_CORPUS)} 项全部一致")
+        sys.exit(1 if failed else 0)
+
+    best, parity, timings = select_fastest(postprocess, args.rounds)
+    for backend, failures in parity.items():
+        timing = f"{timings[backend]:.2f} ms" if backend in timings else "未通过一致性检查"
+        print(f"{'🏆' if backend == best else '  '} {backend}: {timing}")
+    if args.save:
+        BACKEND_CHOICE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        BACKEND_CHOICE_FILE.write_text(json.dumps({'backend': best, 'timings_ms': timings}, ensure_ascii=False),
+                                       encoding='utf-8')
+        print(f"✅ 已保存默认后端: {best}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,17 +6,41 @@ Markdown 转 HTML 工具 (基于 baoyu-markdown-to-html 设计)
 - 支持多种主题（default, grace, simple）
 - 支持 frontmatter 元数据
 - 支持表格、代码块、脚注、警告框
+- 可选中文排版规范化（--typography，见 cjk_typography）
 - ASCII 架构图横向滚动
 - 移动端适配
 """
 
 import argparse
+import hashlib
+import html as html_lib
 import json
-import markdown
+import os
 import re
 import sys
+from collections import OrderedDict
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
+from string import Formatter
+
+try:
+    from pygments import highlight as pygments_highlight
+    from pygments.formatters import HtmlFormatter
+    from pygments.lexers import get_lexer_by_name
+    from pygments.token import Token
+    from pygments.util import ClassNotFound
+    HAS_PYGMENTS = True
+except ImportError:
+    HAS_PYGMENTS = False
+
+# 部署后以 tools.markdown_to_html 导入（包内相对导入），源码目录中直接运行时按同级模块导入
+try:
+    from .cjk_typography import normalize_typography
+    from .markdown_backends import BACKENDS, get_converter, resolve_backend
+except ImportError:
+    from cjk_typography import normalize_typography
+    from markdown_backends import BACKENDS, get_converter, resolve_backend
 
 # 经典主题（默认）
 THEME_DEFAULT = """<!DOCTYPE html>
@@ -332,64 +356,332 @@ THEMES = {
     'grace': THEME_GRACE
 }
 
+# 自定义主题目录：每个子目录是一个主题，包含 style.css 和可选的 layout.html
+# layout.html 中用 {title} / {content} / {author} 标记插入位置
+THEMES_DIR = Path(os.environ.get('MD2HTML_THEMES_DIR', '/root/.openclaw/workspace/themes'))
+
+THEME_SKELETON_HEAD = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title}</title>
+    <style>
+"""
+
+THEME_SKELETON_TAIL = """
+    </style>
+</head>
+"""
+
+DEFAULT_LAYOUT = """<body>
+{content}
+<div class="author">{author}</div>
+</body>"""
+
+THEME_FIELD_RE = re.compile(r'\{(title|content|author)\}')
+
+# 已编译的目录主题：name -> (文件 mtime 标识, 编译结果)
+_theme_cache = {}
+
+def compile_template(template: str) -> list:
+    """把 str.format 风格的内置模板编译为 [(字面量, 字段名), ...] 片段"""
+    return [(literal, field) for literal, field, _, _ in Formatter().parse(template)]
+
+def compile_theme_files(css: str, layout: str) -> list:
+    """把主题目录中的 CSS 和布局编译为 [(字面量, 字段名), ...] 片段（CSS 中的花括号无需转义）"""
+    *segments, (literal, _) = compile_template(THEME_SKELETON_HEAD)
+    pieces = THEME_FIELD_RE.split(THEME_SKELETON_TAIL + layout + "\n</html>")
+    pieces[0] = literal + css + pieces[0]
+    pieces.append(None)
+    segments += [(pieces[i], pieces[i + 1]) for i in range(0, len(pieces) - 1, 2)]
+    return segments
+
+@lru_cache(maxsize=None)
+def _compiled_builtin(theme: str) -> list:
+    return compile_template(THEMES[theme])
+
+def _theme_files(theme: str):
+    theme_dir = THEMES_DIR / theme
+    return theme_dir / 'style.css', theme_dir / 'layout.html'
+
+def load_compiled_theme(theme: str) -> list:
+    """获取编译后的主题：目录主题按 mtime 缓存，文件变化后自动重新编译；不存在时退回内置主题"""
+    css_path, layout_path = _theme_files(theme)
+    try:
+        css_stat = css_path.stat()
+    except OSError:
+        return _compiled_builtin(theme if theme in THEMES else 'default')
+
+    try:
+        layout_mtime = layout_path.stat().st_mtime_ns
+    except OSError:
+        layout_mtime = None
+    key = (css_stat.st_mtime_ns, css_stat.st_size, layout_mtime)
+
+    cached = _theme_cache.get(theme)
+    if cached and cached[0] == key:
+        return cached[1]
+
+    css = css_path.read_text(encoding='utf-8')
+    layout = layout_path.read_text(encoding='utf-8') if layout_mtime is not None else DEFAULT_LAYOUT
+    compiled = compile_theme_files(css, layout)
+    _theme_cache[theme] = (key, compiled)
+    return compiled
+
+def available_themes() -> list:
+    """可用主题：内置主题 + 主题目录中包含 style.css 的子目录"""
+    names = list(THEMES)
+    if THEMES_DIR.is_dir():
+        for entry in sorted(THEMES_DIR.iterdir()):
+            if entry.name not in names and (entry / 'style.css').is_file():
+                names.append(entry.name)
+    return names
+
+# 各主题对应的代码高亮配色（Pygments style）
+CODE_STYLES = {
+    'default': 'friendly',
+    'simple': 'one-dark',
+    'grace': 'xcode',
+}
+
+# 高亮结果缓存：key 为 (代码, 语言, 配色) 的哈希
+HIGHLIGHT_CACHE_SIZE = 512
+_highlight_cache = OrderedDict()
+
+# 代码块用 str.find 定位首尾，只用正则读取语言名（避免 DOTALL 的 .*? 在未闭合时反复回溯）
+CODE_LANG_RE = re.compile(r' class="([\w+#.-]+)">')
+
+@lru_cache(maxsize=None)
+def get_lexer(lang: str):
+    """按语言名加载 Lexer（每种语言只加载一次），未知语言返回 None"""
+    try:
+        return get_lexer_by_name(lang, stripnl=False, ensurenl=False)
+    except ClassNotFound:
+        return None
+
+@lru_cache(maxsize=None)
+def get_code_formatter(style: str):
+    """构造输出内联样式的 HtmlFormatter，并返回 (formatter, pre 样式)"""
+    formatter = HtmlFormatter(style=style, nowrap=True, noclasses=True)
+    color = formatter.style.style_for_token(Token)['color'] or '333333'
+    pre_style = (
+        f"background: {formatter.style.background_color}; color: #{color}; "
+        "padding: 16px; border-radius: 4px; overflow-x: auto; white-space: pre; "
+        "margin: 16px 0; font-family: Menlo, Monaco, Consolas, monospace; "
+        "font-size: 13px; line-height: 1.5;"
+    )
+    return formatter, pre_style
+
+def highlight_code(code: str, lang: str, style: str = 'friendly') -> str:
+    """高亮单个代码块，返回带内联样式的 <pre>；无法高亮时返回 None"""
+    key = hashlib.sha1(f"{style}\0{lang}\0{code}".encode('utf-8')).hexdigest()
+    cached = _highlight_cache.get(key)
+    if cached is not None:
+        _highlight_cache.move_to_end(key)
+        return cached
+
+    lexer = get_lexer(lang)
+    if lexer is None:
+        return None
+    formatter, pre_style = get_code_formatter(style)
+    spans = pygments_highlight(code, lexer, formatter)
+    result = f'<pre style="{pre_style}"><code style="background: none; padding: 0; color: inherit;">{spans}</code></pre>'
+
+    _highlight_cache[key] = result
+    if len(_highlight_cache) > HIGHLIGHT_CACHE_SIZE:
+        _highlight_cache.popitem(last=False)
+    return result
+
+def highlight_code_blocks(html_content: str, theme: str = 'default') -> str:
+    """将带语言标记的围栏代码块替换为内联样式高亮（微信会保留内联样式）"""
+    if not HAS_PYGMENTS or '<pre><code class=' not in html_content:
+        return html_content
+    style = CODE_STYLES.get(theme, CODE_STYLES['default'])
+
+    out = []
+    pos = 0
+    while True:
+        start = html_content.find('<pre><code', pos)
+        if start == -1:
+            break
+        close = html_content.find('</code></pre>', start)
+        if close == -1:
+            # 后面没有闭合标签，之后的代码块也不可能闭合
+            break
+        end = close + 13
+        match = CODE_LANG_RE.match(html_content, start + 10, close)
+        highlighted = None
+        if match:
+            highlighted = highlight_code(html_lib.unescape(html_content[match.end():close]), match.group(1), style)
+        out.append(html_content[pos:start])
+        out.append(highlighted or html_content[start:end])
+        pos = end
+
+    out.append(html_content[pos:])
+    return ''.join(out)
+
+def _parse_frontmatter_lines(lines) -> dict:
+    """解析 frontmatter 的 key: value 行"""
+    metadata = {}
+    for line in lines:
+        if ':' in line:
+            key, value = line.split(':', 1)
+            metadata[key.strip()] = value.strip()
+    return metadata
+
 def parse_frontmatter(content: str) -> tuple[dict, str]:
     """解析 YAML frontmatter"""
-    pattern = r'^---\n(.*?)\n---\n(.*)$'
-    match = re.match(pattern, content, re.DOTALL)
-    
-    if match:
-        frontmatter = match.group(1)
-        body = match.group(2)
-        metadata = {}
-        for line in frontmatter.strip().split('\n'):
-            if ':' in line:
-                key, value = line.split(':', 1)
-                metadata[key.strip()] = value.strip()
-        return metadata, body
-    return {}, content
+    if not content.startswith('---\n'):
+        return {}, content
+    # 只查找闭合的 ---，不对全文做正则匹配
+    end = content.find('\n---\n', 4)
+    if end == -1:
+        return {}, content
+    metadata = _parse_frontmatter_lines(content[4:end].strip().split('\n'))
+    return metadata, content[end + 5:]
+
+def read_frontmatter_header(path, max_bytes: int = 65536) -> dict:
+    """只读取文件头部的 frontmatter，读到闭合的 --- 即停止，不读取正文
+
+    frontmatter 中没有 title 时，仅再读取正文第一个非空行尝试提取标题
+    （与 extract_title 的规则一致）。
+    """
+    metadata = {}
+    with open(path, 'rb') as f:
+        first = f.readline(max_bytes)
+        if first.rstrip(b'\r\n') == b'---':
+            lines, read, closed = [], len(first), False
+            while read < max_bytes:
+                line = f.readline(max_bytes - read)
+                if not line:
+                    break
+                read += len(line)
+                text = line.decode('utf-8', errors='replace').rstrip('\r\n')
+                if text == '---':
+                    closed = True
+                    break
+                lines.append(text)
+            if closed:
+                metadata = _parse_frontmatter_lines(lines)
+            else:
+                # 文件结束或超过 max_bytes 仍没有闭合的 ---，按无 frontmatter 处理
+                f.seek(0)
+        else:
+            f.seek(0)
+
+        if not metadata.get('title'):
+            for _ in range(64):
+                line = f.readline(4096)
+                if not line:
+                    break
+                text = line.decode('utf-8', errors='replace').strip()
+                if not text or text == '---':
+                    continue
+                match = re.match(r'^#{1,2} (.+)$', text)
+                if match:
+                    metadata['title'] = match.group(1)
+                break
+    return metadata
+
+TITLE_RE = re.compile(r'\s*#{1,2} (.+)')
 
 def extract_title(content: str) -> str:
-    """从内容中提取标题"""
-    # 尝试 H1
-    match = re.match(r'^# (.+)$', content.strip(), re.MULTILINE)
-    if match:
-        return match.group(1)
-    # 尝试 H2
-    match = re.match(r'^## (.+)$', content.strip(), re.MULTILINE)
+    """从内容中提取标题（只看第一个非空行的 H1/H2，不复制全文）"""
+    match = TITLE_RE.match(content)
     if match:
         return match.group(1)
     return "Article"
 
+ALERT_TYPES = ('NOTE', 'WARNING', 'TIP', 'IMPORTANT')
+
+BLOCKQUOTE_TAG_RE = re.compile(r'<(/?)blockquote\b')
+
+def _match_blockquotes(html: str) -> dict:
+    """一次扫描配对所有引用块（支持嵌套），返回 {<blockquote 位置: 对应 </blockquote> 位置}"""
+    pairs, stack = {}, []
+    for match in BLOCKQUOTE_TAG_RE.finditer(html):
+        if match.group(1):
+            if stack:
+                pairs[stack.pop()] = match.start()
+        else:
+            stack.append(match.start())
+    return pairs
+
 def convert_alerts(html: str) -> str:
-    """转换警告框"""
-    html = re.sub(
-        r'> \[!NOTE\](.*?)',
-        r'<div class="alert alert-note"><strong>NOTE:</strong>\1',
-        html, flags=re.DOTALL
-    )
-    html = re.sub(
-        r'> \[!WARNING\](.*?)',
-        r'<div class="alert alert-warning"><strong>WARNING:</strong>\1',
-        html, flags=re.DOTALL
-    )
-    html = re.sub(
-        r'> \[!TIP\](.*?)',
-        r'<div class="alert alert-tip"><strong>TIP:</strong>\1',
-        html, flags=re.DOTALL
-    )
-    html = re.sub(
-        r'> \[!IMPORTANT\](.*?)',
-        r'<div class="alert alert-important"><strong>IMPORTANT:</strong>\1',
-        html, flags=re.DOTALL
-    )
-    # 关闭标签
-    html = re.sub(r'(</div>\n?)', r'\1</div>', html)
-    return html
+    """转换警告框：> [!NOTE] / [!WARNING] / [!TIP] / [!IMPORTANT] 开头的引用块"""
+    if '[!' not in html:
+        return html
+
+    pairs = None
+    out = []
+    pos = 0
+    while True:
+        start = html.find('<blockquote>', pos)
+        if start == -1:
+            break
+        i = start + 12
+        while i < len(html) and html[i] in ' \t\r\n':
+            i += 1
+        close = html.find(']', i + 5, i + 20) if html.startswith('<p>[!', i) else -1
+        kind = html[i + 5:close] if close != -1 else ''
+        end = -1
+        if kind in ALERT_TYPES:
+            if pairs is None:
+                pairs = _match_blockquotes(html)
+            end = pairs.get(start, -1)
+        if end == -1:
+            out.append(html[pos:i])
+            pos = i
+            continue
+
+        body = html[close + 1:end].lstrip()
+        body = body[4:].lstrip() if body.startswith('</p>') else '<p>' + body
+        out.append(html[pos:start])
+        out.append(f'<div class="alert alert-{kind.lower()}"><strong>{kind}:</strong>{body}</div>')
+        pos = end + 13
+
+    out.append(html[pos:])
+    return ''.join(out)
+
+def render_body(body: str, theme: str = 'default', backend: str = None, typography: bool = False) -> str:
+    """将 Markdown 正文渲染为 HTML 片段（不含主题外壳）
+
+    backend 为 Markdown 解析后端（见 markdown_backends），默认由 resolve_backend 决定
+    typography=True 时先做中文排版规范化（代码块、行内代码不受影响）
+    """
+    if typography:
+        body = normalize_typography(body)
+    html_content = get_converter(resolve_backend(backend))(body)
+    
+    # 代码高亮
+    html_content = highlight_code_blocks(html_content, theme)
+    
+    # 转换警告框
+    return convert_alerts(html_content)
+
+def render_theme_parts(html_content: str, theme: str = 'default', title: str = '', author: str = '') -> list:
+    """用编译好的主题片段包裹 HTML，返回可直接 writelines 的字符串列表"""
+    values = {'title': title, 'content': html_content, 'author': author}
+    parts = []
+    for literal, field in load_compiled_theme(theme):
+        parts.append(literal)
+        if field:
+            parts.append(values[field])
+    return parts
+
+def apply_theme(html_content: str, theme: str = 'default', title: str = '', author: str = '') -> str:
+    """用主题模板包裹 HTML 片段"""
+    return ''.join(render_theme_parts(html_content, theme, title, author))
 
 def convert_markdown_to_html(markdown_content: str, theme: str = 'default', 
                               title: str = '', author: str = '', 
-                              keep_title: bool = False) -> str:
-    """将 Markdown 转换为 HTML"""
+                              keep_title: bool = False, as_parts: bool = False,
+                              backend: str = None, typography: bool = False) -> str:
+    """将 Markdown 转换为 HTML
+
+    as_parts=True 时返回主题片段列表（用于 writelines 直接写出，省去整篇拼接）
+    """
     # 解析 frontmatter
     metadata, body = parse_frontmatter(markdown_content)
     
@@ -402,20 +694,11 @@ def convert_markdown_to_html(markdown_content: str, theme: str = 'default',
         body = re.sub(r'^# .+\n', '', body, count=1, flags=re.MULTILINE)
     
     # 转换为 HTML
-    md = markdown.Markdown(
-        extensions=['tables', 'fenced_code', 'footnotes'],
-        extension_configs={
-            'fenced_code': {'lang_prefix': ''},
-        }
-    )
-    html_content = md.convert(body)
-    
-    # 转换警告框
-    html_content = convert_alerts(html_content)
+    html_content = render_body(body, theme, backend, typography)
     
     # 选择主题
-    template = THEMES.get(theme, THEMES['default'])
-    full_html = template.format(title=title, content=html_content, author=author)
+    parts = render_theme_parts(html_content, theme, title, author)
+    full_html = parts if as_parts else ''.join(parts)
     
     return full_html, {'title': title, 'author': author}
 
@@ -423,12 +706,16 @@ def main():
     parser = argparse.ArgumentParser(description='Markdown 转 HTML 工具')
     parser.add_argument('input', nargs='?', default=None, help='输入 Markdown 文件路径或内容')
     parser.add_argument('-o', '--output', default=None, help='输出 HTML 文件路径')
-    parser.add_argument('--theme', default='default', choices=['default', 'simple', 'grace'],
-                        help='主题风格 (default/simple/grace)')
+    parser.add_argument('--theme', default='default', choices=available_themes(),
+                        help=f'主题风格 (default/simple/grace，或 {THEMES_DIR} 下的自定义主题)')
     parser.add_argument('-t', '--title', default='', help='文章标题')
     parser.add_argument('-a', '--author', default='', help='作者名称')
     parser.add_argument('--keep-title', action='store_true', help='保留标题')
     parser.add_argument('--stdin', action='store_true', help='从标准输入读取')
+    parser.add_argument('--backend', default='auto', choices=['auto', *BACKENDS],
+                        help='Markdown 解析后端（auto：MD2HTML_BACKEND 或 markdown_backends.py bench --save 的选择）')
+    parser.add_argument('--typography', action='store_true',
+                        help='中文排版规范化（中英文间距、全半角标点、重复感叹号）')
     parser.add_argument('--json', action='store_true', help='输出 JSON 格式')
     
     args = parser.parse_args()
@@ -446,8 +733,9 @@ def main():
         sys.exit(1)
     
     # 转换为 HTML
-    html, metadata = convert_markdown_to_html(
-        markdown_content, args.theme, args.title, args.author, args.keep_title
+    parts, metadata = convert_markdown_to_html(
+        markdown_content, args.theme, args.title, args.author, args.keep_title, as_parts=True,
+        backend=args.backend, typography=args.typography
     )
     
     # 输出
@@ -460,12 +748,14 @@ def main():
         }
         print(json.dumps(result, ensure_ascii=False, indent=2))
     elif args.output:
-        Path(args.output).write_text(html, encoding='utf-8')
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.writelines(parts)
         print(f"✅ 已保存: {args.output}")
         if args.json:
             print(json.dumps({'htmlPath': args.output}, ensure_ascii=False))
     else:
-        print(html)
+        sys.stdout.writelines(parts)
+        sys.stdout.write('\n')
 
 if __name__ == "__main__":
     main()
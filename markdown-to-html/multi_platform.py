@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+"""
+多平台输出（一次解析，多种产物）
+
+功能：Markdown 只解析一次，同时生成多个平台的版本
+- wechat：主题 HTML（与 markdown_to_html.py 输出一致）
+- xiaohongshu：小红书纯文本，短段落，500-1000 字
+- x：X（推特）串推，每条按加权长度不超过 280（中文等宽字符计 2，链接计 23）
+
+Markdown 经解析后端转为 HTML 一次；公众号版本在此基础上做代码高亮和主题包装，
+文字平台从同一份 HTML 中提取块结构（标题、段落、列表、引用、表格行），不再重复解析。
+
+用法：
+    python multi_platform.py article.md                          # 输出小红书文本和串推
+    python multi_platform.py article.md -o out/ --theme grace    # 三个平台写入目录
+    python multi_platform.py article.md --platforms x --json
+"""
+
+import argparse
+import json
+import re
+import sys
+from html.parser import HTMLParser
+from pathlib import Path
+
+from cjk_typography import normalize_typography
+from markdown_backends import BACKENDS, get_converter, resolve_backend
+from markdown_to_html import (available_themes, convert_alerts, extract_title, highlight_code_blocks,
+                              parse_frontmatter, render_theme_parts)
+
+PLATFORMS = ('wechat', 'xiaohongshu', 'x')
+
+# 小红书：正文字数范围，单段上限
+XHS_MIN_CHARS = 500
+XHS_MAX_CHARS = 1000
+XHS_PARAGRAPH_CHARS = 80
+
+# X：单条加权长度上限、链接计数、串推条数上限
+X_MAX_WEIGHT = 280
+X_URL_WEIGHT = 23
+X_MAX_POSTS = 25
+# 编号 " 25/25" 预留的长度
+X_NUMBER_RESERVE = 6
+
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+# 决定文字归属哪种块的标签（由内向外查找）
+BLOCK_CONTAINERS = HEADING_TAGS | {'pre', 'tr', 'li', 'blockquote'}
+BLOCK_BOUNDARIES = BLOCK_CONTAINERS | {'p', 'ul', 'ol', 'table', 'div', 'section', 'td', 'th'}
+VOID_TAGS = {'br', 'hr', 'img', 'input', 'meta', 'link', 'wbr'}
+
+ALERT_MARK_RE = re.compile(r'^\[!(?:NOTE|WARNING|TIP|IMPORTANT|CAUTION)\]\s*', re.IGNORECASE)
+# 句子：到句末标点（可带收尾引号）或英文句点加空格为止
+SENTENCE_RE = re.compile(r'[^。！？!?；;…\n]*?(?:[。！？!?；;…]+[”’」』）)"]*|\.(?=\s)|$)')
+URL_RE = re.compile(r'https?://[^\s<>()]+')
+
+
+class _BlockCollector(HTMLParser):
+    """把解析后端输出的 HTML 展平为块列表 [(类型, 文字)]
+
+    类型：h1-h6 / p / ul / ol（文字带序号）/ quote / code / row（单元格以 | 连接）/ img（alt）/ hr
+    脚注引用与脚注区、<script>/<style> 内容跳过；行内标记只保留文字
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks = []
+        self.stack = []
+        self.text = []
+        self.cells = []
+        self.lists = []          # [是否有序, 当前序号, 待输出的序号]
+        self.skip_depth = 0
+
+    def _kind(self) -> str:
+        for tag in reversed(self.stack):
+            if tag in BLOCK_CONTAINERS:
+                if tag == 'pre':
+                    return 'code'
+                if tag == 'blockquote':
+                    return 'quote'
+                if tag == 'li':
+                    return 'ol' if self.lists and self.lists[-1][0] else 'ul'
+                return 'row' if tag == 'tr' else tag
+        return 'p'
+
+    def _flush(self):
+        if not self.text:
+            return
+        text = ''.join(self.text)
+        self.text = []
+        kind = self._kind()
+        if kind == 'code':
+            text = text.strip('\n')
+        else:
+            text = ' '.join(text.split())
+        if not text:
+            return
+        if kind == 'row':
+            self.cells.append(text)
+            return
+        if kind == 'quote':
+            text = ALERT_MARK_RE.sub('', text)
+            if not text:
+                return
+        if kind == 'ol' and self.lists:
+            # 同一列表项被嵌套列表打断后的后续文字不再重复编号
+            number = self.lists[-1][2]
+            if number:
+                text = f"{number}. {text}"
+                self.lists[-1][2] = 0
+        self.blocks.append((kind, text))
+
+    def handle_starttag(self, tag, attrs):
+        if self.skip_depth:
+            if tag not in VOID_TAGS:
+                self.skip_depth += 1
+            return
+        attrs = dict(attrs)
+        classes = (attrs.get('class') or '').split()
+        if tag in ('sup', 'script', 'style') or (
+                tag in ('div', 'section') and ('footnote' in classes or 'footnotes' in classes)):
+            self.skip_depth = 1
+            return
+        if tag in BLOCK_BOUNDARIES:
+            self._flush()
+        if tag == 'br':
+            self.text.append('\n')
+        elif tag == 'img':
+            self._flush()
+            self.blocks.append(('img', attrs.get('alt') or ''))
+        elif tag == 'hr':
+            self._flush()
+            self.blocks.append(('hr', ''))
+        elif tag in ('ul', 'ol'):
+            start = attrs.get('start') or '1'
+            self.lists.append([tag == 'ol', int(start) - 1 if start.isdigit() else 0, 0])
+        elif tag == 'li' and self.lists:
+            self.lists[-1][1] += 1
+            self.lists[-1][2] = self.lists[-1][1]
+        elif tag == 'tr':
+            self.cells = []
+        if tag not in VOID_TAGS:
+            self.stack.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in VOID_TAGS:
+            return
+        if self.skip_depth:
+            self.skip_depth -= 1
+            return
+        if tag not in self.stack:
+            return
+        if tag in BLOCK_BOUNDARIES:
+            self._flush()
+        while self.stack:
+            opened = self.stack.pop()
+            if opened in ('ul', 'ol') and self.lists:
+                self.lists.pop()
+            elif opened == 'tr' and self.cells:
+                self.blocks.append(('row', ' | '.join(self.cells)))
+                self.cells = []
+            if opened == tag:
+                break
+
+    def handle_data(self, data):
+        if not self.skip_depth:
+            self.text.append(data)
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def html_to_blocks(html: str) -> list:
+    """从渲染结果中提取块结构"""
+    collector = _BlockCollector()
+    collector.feed(html)
+    collector.close()
+    return collector.blocks
+
+
+def parse_article(markdown_content: str, title: str = '', author: str = '', keep_title: bool = False,
+                  backend: str = None, typography: bool = False) -> dict:
+    """解析一次：frontmatter、标题作者、解析后端输出的 HTML（未高亮、未套主题）"""
+    metadata, body = parse_frontmatter(markdown_content)
+    title = title or metadata.get('title', '') or extract_title(body)
+    author = author or metadata.get('author', metadata.get('description', ''))
+    if not keep_title:
+        body = re.sub(r'^# .+\n', '', body, count=1, flags=re.MULTILINE)
+    if typography:
+        body = normalize_typography(body)
+    return {
+        'title': title,
+        'author': author,
+        'metadata': metadata,
+        'html': get_converter(resolve_backend(backend))(body),
+    }
+
+
+def split_sentences(text: str) -> list:
+    return [s.strip() for s in SENTENCE_RE.findall(text) if s.strip()]
+
+
+def _short_paragraphs(text: str, limit: int) -> list:
+    """把长段落按句子拆成不超过 limit 字的短段落（单句超长时保留整句）"""
+    if len(text) <= limit:
+        return [text]
+    paragraphs, current = [], ''
+    for sentence in split_sentences(text):
+        if current and len(current) + len(sentence) > limit:
+            paragraphs.append(current)
+            current = ''
+        current = f"{current} {sentence}" if current and sentence[0].isascii() and current[-1].isascii() \
+            else current + sentence
+    if current:
+        paragraphs.append(current)
+    return paragraphs
+
+
+def emit_xiaohongshu(blocks: list, title: str = '', max_chars: int = XHS_MAX_CHARS) -> str:
+    """小红书纯文本：标题、短段落，列表与表格行各占一行，超过 max_chars 时在句子处截断"""
+    paragraphs = [title] if title else []
+    group = []
+    for kind, text in blocks:
+        if kind in ('ul', 'ol', 'row'):
+            group.append(f"· {text}" if kind != 'ol' else text)
+            continue
+        if group:
+            paragraphs.append('\n'.join(group))
+            group = []
+        if kind in HEADING_TAGS:
+            paragraphs.append(f"📌 {text}")
+        elif kind == 'quote':
+            paragraphs.append(f"💡 {text}")
+        elif kind == 'p':
+            paragraphs.extend(_short_paragraphs(text, XHS_PARAGRAPH_CHARS))
+    if group:
+        paragraphs.append('\n'.join(group))
+
+    out, length = [], 0
+    for paragraph in paragraphs:
+        extra = len(paragraph) + (2 if out else 0)
+        if length + extra <= max_chars:
+            out.append(paragraph)
+            length += extra
+            continue
+        # 放不下整段：尽量补入前几句
+        room = max_chars - length - (2 if out else 0) - 1
+        kept = ''
+        for sentence in split_sentences(paragraph):
+            if len(kept) + len(sentence) > room:
+                break
+            kept += sentence
+        if kept:
+            out.append(kept + '…')
+        elif out:
+            out[-1] += '…'
+        break
+    return '\n\n'.join(out)
+
+
+def _char_weight(char: str) -> int:
+    code = ord(char)
+    if code <= 0x10FF or 0x2000 <= code <= 0x200D or 0x2010 <= code <= 0x201F or 0x2032 <= code <= 0x2037:
+        return 1
+    return 2
+
+
+def weighted_length(text: str) -> int:
+    """X 的加权长度：拉丁字符计 1，中日韩文字和表情计 2，链接一律计 23"""
+    total, pos = 0, 0
+    for match in URL_RE.finditer(text):
+        segment = text[pos:match.start()]
+        total += len(segment) if segment.isascii() else sum(map(_char_weight, segment))
+        total += X_URL_WEIGHT
+        pos = match.end()
+    segment = text[pos:]
+    return total + (len(segment) if segment.isascii() else sum(map(_char_weight, segment)))
+
+
+def _hard_split(text: str, budget: int) -> list:
+    """按加权长度硬切（尽量在空格处断开）"""
+    pieces = []
+    while weighted_length(text) > budget:
+        weight, cut = 0, 0
+        for i, char in enumerate(text):
+            weight += _char_weight(char)
+            if weight > budget:
+                cut = i
+                break
+        space = text.rfind(' ', 0, cut)
+        if space > cut // 2:
+            cut = space
+        pieces.append(text[:cut].rstrip())
+        text = text[cut:].lstrip()
+    if text:
+        pieces.append(text)
+    return pieces
+
+
+def _fit_units(text: str, budget: int) -> list:
+    """把超长的内容单元拆成每段不超过 budget 的片段（先按句子，再硬切）"""
+    if weighted_length(text) <= budget:
+        return [text]
+    units, current = [], ''
+    for sentence in split_sentences(text):
+        joined = f"{current} {sentence}" if current and sentence[0].isascii() else current + sentence
+        if weighted_length(joined) <= budget:
+            current = joined
+            continue
+        if current:
+            units.append(current)
+        if weighted_length(sentence) <= budget:
+            current = sentence
+        else:
+            *head, current = _hard_split(sentence, budget)
+            units.extend(head)
+    if current:
+        units.append(current)
+    return units
+
+
+def emit_x_thread(blocks: list, title: str = '', tags: list = (), max_posts: int = X_MAX_POSTS) -> list:
+    """X 串推：标题作首条开头，内容按块贪心装入，每条加权长度 ≤ 280，多条时末尾编号 i/n
+
+    超过 max_posts 条的部分丢弃
+    """
+    budget = X_MAX_WEIGHT - X_NUMBER_RESERVE
+    # 内容单元 (与上一单元的分隔符, 文字)：连续的列表项、表格行之间只换一行；超长单元先拆成不超过 budget 的片段
+    units = []
+
+    def add(separator: str, text: str):
+        for i, piece in enumerate(_fit_units(text, budget)):
+            units.append((separator if i == 0 else '\n\n', piece))
+
+    if title:
+        add('\n\n', f"{title} 🧵")
+    previous, heading = None, ''
+    for kind, text in blocks:
+        if kind in ('code', 'img', 'hr'):
+            continue
+        if kind in HEADING_TAGS:
+            # 小标题并入下一个单元，避免落在一条的末尾
+            if heading:
+                add('\n\n', heading)
+            heading, previous = text, kind
+            continue
+        if kind == 'ul':
+            text = f"• {text}"
+        elif kind == 'quote':
+            text = f"“{text}”"
+        separator = '\n' if kind in ('ul', 'ol', 'row') and previous in ('ul', 'ol', 'row') else '\n\n'
+        if heading:
+            if weighted_length(f"{heading}\n{text}") <= budget:
+                text = f"{heading}\n{text}"
+            else:
+                add('\n\n', heading)
+            heading = ''
+        add(separator, text)
+        previous = kind
+    if heading:
+        add('\n\n', heading)
+    hashtags = ' '.join(f"#{tag}" for tag in tags if tag)
+    if hashtags:
+        add('\n\n', hashtags)
+
+    posts, current = [], ''
+    for separator, unit in units:
+        joined = f"{current}{separator}{unit}" if current else unit
+        if weighted_length(joined) <= budget or not current:
+            current = joined
+            continue
+        posts.append(current)
+        current = unit
+        if len(posts) >= max_posts:
+            break
+    else:
+        if current:
+            posts.append(current)
+    posts = posts[:max_posts]
+
+    if len(posts) > 1:
+        posts = [f"{post} {i}/{len(posts)}" for i, post in enumerate(posts, 1)]
+    return posts
+
+
+def _frontmatter_tags(metadata: dict) -> list:
+    raw = metadata.get('tags', '').strip('[]')
+    return [tag.strip().strip('"\'#').replace(' ', '') for tag in re.split(r'[,，\s]+', raw) if tag.strip()]
+
+
+def render_platforms(markdown_content: str, platforms=PLATFORMS, theme: str = 'default',
+                     title: str = '', author: str = '', keep_title: bool = False,
+                     backend: str = None, typography: bool = False) -> dict:
+    """一次解析，生成多个平台的版本
+
+    返回 {'title', 'author', 'wechat': HTML, 'xiaohongshu': 文本, 'x': [串推]}（只含请求的平台）
+    """
+    unknown = [p for p in platforms if p not in PLATFORMS]
+    if unknown:
+        raise ValueError(f"未知的平台: {', '.join(unknown)}（可选: {', '.join(PLATFORMS)}）")
+
+    article = parse_article(markdown_content, title, author, keep_title, backend, typography)
+    result = {'title': article['title'], 'author': article['author']}
+
+    if 'wechat' in platforms:
+        html_content = convert_alerts(highlight_code_blocks(article['html'], theme))
+        result['wechat'] = ''.join(render_theme_parts(html_content, theme, article['title'], article['author']))
+
+    if 'xiaohongshu' in platforms or 'x' in platforms:
+        blocks = html_to_blocks(article['html'])
+        if 'xiaohongshu' in platforms:
+            result['xiaohongshu'] = emit_xiaohongshu(blocks, article['title'])
+        if 'x' in platforms:
+            result['x'] = emit_x_thread(blocks, article['title'], _frontmatter_tags(article['metadata']))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='多平台输出（一次解析，多种产物）')
+    parser.add_argument('input', help='Markdown 文件路径')
+    parser.add_argument('--platforms', default=','.join(PLATFORMS),
+                        help=f'输出平台，逗号分隔（默认 {",".join(PLATFORMS)}）')
+    parser.add_argument('-o', '--output-dir', default=None, help='输出目录（按 <文件名>.<平台> 写入）')
+    parser.add_argument('--theme', default='default', choices=available_themes(), help='公众号主题')
+    parser.add_argument('-t', '--title', default='', help='文章标题')
+    parser.add_argument('-a', '--author', default='', help='作者名称')
+    parser.add_argument('--keep-title', action='store_true', help='保留标题')
+    parser.add_argument('--backend', default='auto', choices=['auto', *BACKENDS], help='Markdown 解析后端')
+    parser.add_argument('--typography', action='store_true', help='中文排版规范化')
+    parser.add_argument('--json', action='store_true', help='输出 JSON 格式')
+    args = parser.parse_args()
+
+    path = Path(args.input)
+    if not path.exists():
+        print(f"❌ 文件不存在: {path}")
+        sys.exit(1)
+    platforms = [p.strip() for p in args.platforms.split(',') if p.strip()]
+    try:
+        result = render_platforms(path.read_text(encoding='utf-8'), platforms, args.theme,
+                                  args.title, args.author, args.keep_title, args.backend, args.typography)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    if args.output_dir:
+        out_dir = Path(args.output_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        files = {}
+        if 'wechat' in result:
+            files['wechat'] = out_dir / f"{path.stem}.wechat.html"
+            files['wechat'].write_text(result['wechat'], encoding='utf-8')
+        if 'xiaohongshu' in result:
+            files['xiaohongshu'] = out_dir / f"{path.stem}.xiaohongshu.txt"
+            files['xiaohongshu'].write_text(result['xiaohongshu'] + '\n', encoding='utf-8')
+        if 'x' in result:
+            files['x'] = out_dir / f"{path.stem}.x.txt"
+            files['x'].write_text('\n\n---\n\n'.join(result['x']) + '\n', encoding='utf-8')
+        result = {**result, 'files': {k: str(v) for k, v in files.items()}}
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        return
+
+    if 'xiaohongshu' in result:
+        text = result['xiaohongshu']
+        if not args.output_dir:
+            print(text + '\n')
+        note = f"（少于 {XHS_MIN_CHARS} 字）" if len(text) < XHS_MIN_CHARS else ''
+        print(f"📝 小红书: {len(text)} 字{note}")
+    if 'x' in result:
+        if not args.output_dir:
+            print('\n\n'.join(result['x']) + '\n')
+        longest = max((weighted_length(post) for post in result['x']), default=0)
+        print(f"🧵 X: {len(result['x'])} 条，最长 {longest}/{X_MAX_WEIGHT}")
+    for platform, file_path in result.get('files', {}).items():
+        print(f"✅ {platform}: {file_path}")
+
+
+if __name__ == "__main__":
+    main()
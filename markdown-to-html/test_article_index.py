@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""article_index 回归测试：未闭合的 frontmatter 不当作元数据，关键词中的 % 和 _ 按字面匹配"""
+
+from article_index import open_index, query_index, update_index
+from markdown_to_html import read_frontmatter_header
+
+
+def test_unterminated_frontmatter_has_no_metadata(tmp_path):
+    path = tmp_path / 'a.md'
+    path.write_text('---\ntitle: 假标题\nauthor: 某人\n' + 'x: y\n' * 100, encoding='utf-8')
+    assert read_frontmatter_header(path, max_bytes=256) == {}
+    path.write_text('---\ntitle: 假标题\n\n正文', encoding='utf-8')
+    assert read_frontmatter_header(path) == {}
+    path.write_text('---\ntitle: 真标题\n---\n正文', encoding='utf-8')
+    assert read_frontmatter_header(path)['title'] == '真标题'
+
+
+def test_keyword_wildcards_are_literal(tmp_path):
+    (tmp_path / 'a.md').write_text('---\ntitle: 提升 100% 性能\n---\n', encoding='utf-8')
+    (tmp_path / 'b.md').write_text('---\ntitle: 提升 100 倍性能\n---\n', encoding='utf-8')
+    (tmp_path / 'c.md').write_text('---\ntitle: snake_case 命名\n---\n', encoding='utf-8')
+    (tmp_path / 'd.md').write_text('---\ntitle: snakeXcase 命名\n---\n', encoding='utf-8')
+    conn = open_index(str(tmp_path / 'index.db'))
+    update_index(conn, str(tmp_path))
+    assert [row['title'] for row in query_index(conn, keyword='100%')] == ['提升 100% 性能']
+    assert [row['title'] for row in query_index(conn, keyword='snake_case')] == ['snake_case 命名']
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""cjk_typography 回归测试：规则样例逐条核对，代码、链接、HTML 属性和 frontmatter 保持原样"""
+
+from cjk_typography import TYPOGRAPHY_CASES, _adhoc, check_cases, normalize_typography
+
+
+def test_rule_cases():
+    assert check_cases() == []
+
+
+def test_adhoc_chain_matches_outside_protected_spans():
+    for text, expected in TYPOGRAPHY_CASES[:11]:
+        assert _adhoc(text) == expected
+
+
+def test_protected_spans_untouched():
+    text = (
+        '---\ntitle: 标题abc,\n---\n'
+        '正文abc, 见<img alt="图ａ,中">和 https://example.com/ａ中b?x=1\n\n'
+        '~~~\n代码ＡＢＣ!?\n~~~\n'
+        '````\n```\n嵌套abc\n````\n'
+        '结尾abc'
+    )
+    assert normalize_typography(text) == (
+        '---\ntitle: 标题abc,\n---\n'
+        '正文 abc, 见<img alt="图ａ,中">和 https://example.com/ａ中b?x=1\n\n'
+        '~~~\n代码ＡＢＣ!?\n~~~\n'
+        '````\n```\n嵌套abc\n````\n'
+        '结尾 abc'
+    )
+
+
+def test_unclosed_fence_protects_rest():
+    text = '前文abc\n```\n代码abc,\n更多abc'
+    assert normalize_typography(text) == '前文 abc\n```\n代码abc,\n更多abc'
+
+
+def test_ascii_unchanged():
+    text = 'Hello, world. Use `a,b` and [x](y)!'
+    assert normalize_typography(text) == text
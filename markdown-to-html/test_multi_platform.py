@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""multi_platform 回归测试：超长标题、小标题也要拆分，串推每条不超过 280 且不为空"""
+
+from multi_platform import X_MAX_WEIGHT, emit_x_thread, weighted_length
+
+
+def test_overlong_title_and_heading_fit_budget():
+    title = '超长标题' * 40
+    blocks = [
+        ('h2', '超长小标题' * 30),
+        ('p', '这是正文的第一段，内容正常。'),
+        ('h2', 'A very long heading ' * 20),
+        ('p', 'Short paragraph.'),
+    ]
+    posts = emit_x_thread(blocks, title, ['标签'])
+    assert len(posts) > 1
+    for i, post in enumerate(posts, 1):
+        body = post[:-len(f" {i}/{len(posts)}")]
+        assert body.strip()
+        assert weighted_length(post) <= X_MAX_WEIGHT
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+发布文章统计报告
+
+功能：统计产物存储中已发布文章的文本特征
+- 只统计发布成功（status 为 success）的运行；同一原文多次发布只计最近一次
+- 内存随去重后的文章数线性增长，与运行次数无关
+- 逐个读取运行的原文 original.md 与 fixed.html，不整体载入内存
+- 每篇文章一次正则扫描提取特征：字数、行数、标题、表格、代码块、图片、链接、列表项
+- 特征写入紧凑的数值数组，用 NumPy 按列聚合：均值、分位数、字数分布、按主题风格/选题分组
+- 输出 JSON，以及用现有主题渲染的静态 HTML 报告
+
+用法：
+    python archive_analytics.py                                  # 打印概要
+    python archive_analytics.py -o report.json --html report.html --theme grace
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from array import array
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+from artifact_store import DEFAULT_ROOT, ArtifactStore, atomic_write_bytes
+
+# 每篇文章的特征（列顺序）
+FEATURES = (
+    'chars', 'lines', 'headings', 'tables', 'table_rows', 'code_blocks', 'code_lines',
+    'images', 'links', 'list_items', 'html_bytes', 'html_tags',
+)
+FEATURE_LABELS = {
+    'chars': '字数', 'lines': '行数', 'headings': '标题数', 'tables': '表格数', 'table_rows': '表格行数',
+    'code_blocks': '代码块数', 'code_lines': '代码行数', 'images': '图片数', 'links': '链接数',
+    'list_items': '列表项数', 'html_bytes': 'HTML 字节', 'html_tags': 'HTML 标签数',
+    'code_density': '代码行占比', 'table_density': '表格行占比', 'html_ratio': 'HTML/原文 倍数',
+}
+COLUMN = {name: i for i, name in enumerate(FEATURES)}
+
+# 字数分布区间
+CHAR_BINS = (0, 500, 1000, 2000, 3000, 5000, 8000, 12000, 20000)
+DEFAULT_TOP_TOPICS = 20
+OTHER_TOPIC = '其他'
+
+# 一次扫描覆盖所有按行/按标记计数的特征；围栏内的匹配只用于定位围栏结束。
+# 模式以单个候选字符（换行、!、]）开头，引擎可按字符集快速跳过正文，上下文放在其后的定宽断言里
+FEATURE_RE = re.compile(
+    r'[\n!\]](?:'
+    r'(?<=\n)(?:(?P<fence> {0,3}(?:`{3,}|~{3,}))'
+    r'|(?P<heading>#{1,6})[ \t]'
+    r'|(?P<table_sep>\|?[ \t]*:?-{3,}:?[ \t]*\|)'
+    r'|(?P<table_row>[ \t]*\|)'
+    r'|(?P<list_item>[ \t]*(?:[-*+]|\d+[.)])[ \t]))'
+    r'|(?<=!)(?P<image>\[)'
+    r'|(?<=\])(?P<link>\())'
+)
+
+
+def extract_features(markdown: str, html: bytes = None) -> tuple:
+    """单篇文章的特征（与 FEATURES 顺序一致）；没有 HTML 时对应列为 NaN"""
+    counts = dict.fromkeys(('heading', 'table_sep', 'table_row', 'list_item', 'image', 'link'), 0)
+    code_blocks = code_lines = 0
+    fence_end = None
+    # 行首规则以换行开头，文首补一个换行
+    text = '\n' + markdown
+    for match in FEATURE_RE.finditer(text):
+        kind = match.lastgroup
+        if fence_end is not None:
+            if kind == 'fence':
+                code_blocks += 1
+                code_lines += text.count('\n', fence_end, match.start())
+                fence_end = None
+            continue
+        if kind == 'fence':
+            fence_end = match.end()
+        else:
+            counts[kind] += 1
+    if fence_end is not None:
+        # 未闭合的代码块延续到文末
+        code_blocks += 1
+        code_lines += text.count('\n', fence_end)
+
+    nan = float('nan')
+    return (
+        len(markdown),
+        markdown.count('\n') + 1,
+        counts['heading'],
+        counts['table_sep'],
+        counts['table_row'],
+        code_blocks,
+        code_lines,
+        counts['image'],
+        counts['link'] - counts['image'],
+        counts['list_item'],
+        len(html) if html is not None else nan,
+        html.count(b'<') if html is not None else nan,
+    )
+
+
+def collect(store: ArtifactStore) -> dict:
+    """逐篇已发布文章提取特征，返回 {matrix, themes, topics, theme_names, topic_counts, topic_names}
+
+    先扫描运行清单，只保留发布成功的运行，并按 original.md 摘要去重（保留最近一次）；
+    特征累积在 array('d') 中（每篇 12 个 double），主题/选题记为整数编码
+
+    内存随去重后的文章数线性增长（不随运行次数增长）：去重表每篇一个元组
+    （时间、两个对象 ID、主题、选题，约几百字节），加上特征矩阵每篇 96 字节；
+    分位数需要全部样本，因此不做流式聚合。失败、预览等运行的清单读完即丢弃
+    """
+    published = {}
+    for manifest in store.iter_runs():
+        artifacts = manifest.get("artifacts", {})
+        if manifest.get("status") != "success" or "original.md" not in artifacts:
+            continue
+        original = artifacts["original.md"]
+        key = original.get("digest") or original["object"]
+        created = manifest.get("created", 0)
+        if key in published and published[key][0] >= created:
+            continue
+        published[key] = (
+            created,
+            original["object"],
+            artifacts["fixed.html"]["object"] if "fixed.html" in artifacts else None,
+            manifest.get("theme") or "unknown",
+            manifest.get("topic") or manifest.get("title") or "unknown",
+        )
+
+    values = array('d')
+    theme_codes, topic_codes = array('i'), array('i')
+    theme_index, topic_index = {}, {}
+    topic_counts = Counter()
+
+    for _, original, fixed, theme, topic in published.values():
+        try:
+            markdown = store.read_blob(original).decode('utf-8', errors='replace')
+            html = store.read_blob(fixed) if fixed else None
+        except OSError:
+            continue
+        values.extend(extract_features(markdown, html))
+
+        theme_codes.append(theme_index.setdefault(theme, len(theme_index)))
+        topic_codes.append(topic_index.setdefault(topic, len(topic_index)))
+        topic_counts[topic_index[topic]] += 1
+
+    return {
+        'matrix': np.frombuffer(values, dtype=np.float64).reshape(-1, len(FEATURES)),
+        'themes': np.frombuffer(theme_codes, dtype=np.int32),
+        'topics': np.frombuffer(topic_codes, dtype=np.int32),
+        'theme_names': list(theme_index),
+        'topic_names': list(topic_index),
+        'topic_counts': topic_counts,
+    }
+
+
+def _derived(matrix) -> dict:
+    """派生指标：代码行、表格行占比，HTML 膨胀倍数"""
+    lines = np.maximum(matrix[:, COLUMN['lines']], 1)
+    chars = np.maximum(matrix[:, COLUMN['chars']], 1)
+    return {
+        'code_density': matrix[:, COLUMN['code_lines']] / lines,
+        'table_density': matrix[:, COLUMN['table_rows']] / lines,
+        'html_ratio': matrix[:, COLUMN['html_bytes']] / chars,
+    }
+
+
+def _column_stats(columns: dict) -> dict:
+    names = list(columns)
+    stacked = np.column_stack([columns[name] for name in names])
+    with np.errstate(all='ignore'):
+        mean = np.nanmean(stacked, axis=0)
+        p10, p50, p90 = np.nanpercentile(stacked, [10, 50, 90], axis=0)
+        low, high = np.nanmin(stacked, axis=0), np.nanmax(stacked, axis=0)
+    return {
+        name: {'mean': round(float(mean[i]), 3), 'p10': round(float(p10[i]), 3), 'median': round(float(p50[i]), 3),
+               'p90': round(float(p90[i]), 3), 'min': round(float(low[i]), 3), 'max': round(float(high[i]), 3)}
+        for i, name in enumerate(names)
+    }
+
+
+def _group_stats(codes, names: list, matrix, derived: dict) -> dict:
+    """按分组编码聚合：篇数、各特征均值、含表格/代码的文章占比"""
+    groups = len(names)
+    counts = np.bincount(codes, minlength=groups)
+    safe = np.maximum(counts, 1)
+    result = {}
+    means = {}
+    for name in ('chars', 'headings', 'tables', 'code_blocks', 'images', 'html_bytes'):
+        column = matrix[:, COLUMN[name]]
+        present = ~np.isnan(column)
+        sums = np.bincount(codes, weights=np.where(present, column, 0.0), minlength=groups)
+        means[name] = sums / np.maximum(np.bincount(codes, weights=present, minlength=groups), 1)
+    for name in ('code_density', 'table_density'):
+        means[name] = np.bincount(codes, weights=derived[name], minlength=groups) / safe
+    with_table = np.bincount(codes, weights=matrix[:, COLUMN['tables']] > 0, minlength=groups) / safe
+    with_code = np.bincount(codes, weights=matrix[:, COLUMN['code_blocks']] > 0, minlength=groups) / safe
+
+    for i in np.argsort(-counts, kind='stable'):
+        if not counts[i]:
+            continue
+        result[names[i]] = {
+            'articles': int(counts[i]),
+            'mean': {name: round(float(values[i]), 3) for name, values in means.items()},
+            'with_table': round(float(with_table[i]), 3),
+            'with_code': round(float(with_code[i]), 3),
+        }
+    return result
+
+
+def analyze(data: dict, top_topics: int = DEFAULT_TOP_TOPICS) -> dict:
+    """聚合为报告数据"""
+    matrix = data['matrix']
+    report = {'articles': int(matrix.shape[0]), 'generated': datetime.now().isoformat(timespec='seconds')}
+    if not matrix.shape[0]:
+        return report
+
+    derived = _derived(matrix)
+    columns = {name: matrix[:, i] for i, name in enumerate(FEATURES)}
+    columns.update(derived)
+    report['features'] = _column_stats(columns)
+
+    counts, _ = np.histogram(matrix[:, COLUMN['chars']], bins=[*CHAR_BINS, np.inf])
+    report['char_histogram'] = [
+        {'from': CHAR_BINS[i], 'to': CHAR_BINS[i + 1] if i + 1 < len(CHAR_BINS) else None, 'articles': int(c)}
+        for i, c in enumerate(counts)
+    ]
+    report['by_theme'] = _group_stats(data['themes'], data['theme_names'], matrix, derived)
+
+    # 选题只保留最常见的若干个，其余合并
+    top = [code for code, _ in data['topic_counts'].most_common(top_topics)]
+    remap = np.full(len(data['topic_names']), len(top), dtype=np.int32)
+    remap[top] = np.arange(len(top), dtype=np.int32)
+    topic_names = [data['topic_names'][code] for code in top] + [OTHER_TOPIC]
+    report['by_topic'] = _group_stats(remap[data['topics']], topic_names, matrix, derived)
+    return report
+
+
+def _fmt(value: float) -> str:
+    if value != value:
+        return '-'
+    return f"{value:.0f}" if abs(value) >= 100 or float(value).is_integer() else f"{value:.2f}"
+
+
+def _cell(text: str) -> str:
+    """Markdown 表格单元格：换行合并为空格，| 转义"""
+    return ' '.join(str(text).split()).replace('|', '\\|')
+
+
+def _group_table(groups: dict, label: str) -> list:
+    lines = [f"| {label} | 篇数 | 平均字数 | 平均标题数 | 含表格 | 含代码 | 代码行占比 | 平均 HTML 字节 |",
+             "|------|------|------|------|------|------|------|------|"]
+    for name, stats in groups.items():
+        mean = stats['mean']
+        lines.append(f"| {_cell(name)} | {stats['articles']} | {_fmt(mean['chars'])} | {_fmt(mean['headings'])} | "
+                     f"{stats['with_table']:.0%} | {stats['with_code']:.0%} | {mean['code_density']:.1%} | "
+                     f"{_fmt(mean['html_bytes'])} |")
+    return lines
+
+
+def report_markdown(report: dict, elapsed: float = None) -> str:
+    """报告的 Markdown 版本（用于主题渲染）"""
+    lines = ["# 发布文章统计报告", "",
+             f"统计 {report['articles']} 篇文章，生成于 {report['generated']}"
+             + (f"，耗时 {elapsed:.1f} 秒" if elapsed is not None else "") + "。", ""]
+    if not report['articles']:
+        return '\n'.join(lines)
+
+    lines += ["## 总体", "", "| 指标 | 平均 | P10 | 中位数 | P90 | 最大 |", "|------|------|------|------|------|------|"]
+    for name, stats in report['features'].items():
+        lines.append(f"| {FEATURE_LABELS.get(name, name)} | {_fmt(stats['mean'])} | {_fmt(stats['p10'])} | "
+                     f"{_fmt(stats['median'])} | {_fmt(stats['p90'])} | {_fmt(stats['max'])} |")
+
+    lines += ["", "## 字数分布", "", "| 字数 | 篇数 | 占比 |", "|------|------|------|"]
+    for bucket in report['char_histogram']:
+        span = f"{bucket['from']}-{bucket['to']}" if bucket['to'] else f"{bucket['from']}+"
+        lines.append(f"| {span} | {bucket['articles']} | {bucket['articles'] / report['articles']:.1%} |")
+
+    lines += ["", "## 按主题风格", ""] + _group_table(report['by_theme'], '主题')
+    lines += ["", "## 按选题", ""] + _group_table(report['by_topic'], '选题')
+    return '\n'.join(lines) + '\n'
+
+
+def render_report_html(markdown: str, theme: str = 'default') -> str:
+    """用 markdown-to-html 的主题渲染报告"""
+    try:
+        sys.path.insert(0, '/root/.openclaw/workspace')
+        from tools.markdown_to_html import convert_markdown_to_html
+        html, _ = convert_markdown_to_html(markdown, theme=theme, title='发布文章统计报告')
+        return html
+    except Exception as e:
+        print(f"⚠️ markdown-to-html 调用失败，使用基础转换: {e}")
+        import markdown as markdown_lib
+        return markdown_lib.markdown(markdown, extensions=['tables'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='发布文章统计报告')
+    parser.add_argument('--root', default=DEFAULT_ROOT, help=f'存储目录（默认 {DEFAULT_ROOT}）')
+    parser.add_argument('-o', '--output', default=None, help='JSON 报告路径')
+    parser.add_argument('--html', default=None, help='HTML 报告路径')
+    parser.add_argument('--theme', default='default', help='HTML 报告主题（default/simple/grace 或自定义主题）')
+    parser.add_argument('--top-topics', type=int, default=DEFAULT_TOP_TOPICS,
+                        help=f'单独统计的选题数（默认 {DEFAULT_TOP_TOPICS}，其余合并为“{OTHER_TOPIC}”）')
+    parser.add_argument('--json', action='store_true', help='输出 JSON 格式')
+    args = parser.parse_args()
+
+    if not HAS_NUMPY:
+        print("❌ 统计报告需要 numpy（pip install numpy）")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    data = collect(ArtifactStore(args.root))
+    report = analyze(data, args.top_topics)
+    elapsed = time.perf_counter() - start
+
+    if args.output:
+        atomic_write_bytes(Path(args.output), json.dumps(report, ensure_ascii=False, indent=2).encode('utf-8'))
+    if args.html:
+        html = render_report_html(report_markdown(report, elapsed), args.theme)
+        atomic_write_bytes(Path(args.html), html.encode('utf-8'))
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+
+    print(f"📊 {report['articles']} 篇文章，耗时 {elapsed:.2f} 秒")
+    if report['articles']:
+        chars = report['features']['chars']
+        print(f"📝 字数：中位数 {chars['median']:.0f}，P10 {chars['p10']:.0f}，P90 {chars['p90']:.0f}")
+        for theme, stats in report['by_theme'].items():
+            print(f"🎨 {theme}: {stats['articles']} 篇，平均 {stats['mean']['chars']:.0f} 字，"
+                  f"含表格 {stats['with_table']:.0%}，含代码 {stats['with_code']:.0%}")
+    if args.output:
+        print(f"✅ JSON 报告已保存: {args.output}")
+    if args.html:
+        print(f"✅ HTML 报告已保存: {args.html}")
+
+
+if __name__ == "__main__":
+    main()
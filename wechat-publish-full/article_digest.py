@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+文章摘要（本地抽取式）
+
+功能：为草稿生成摘要（公众号列表页标题下的那行字），不再调用大模型
+- 按中文标点切分句子（。！？；… 及引号收尾）
+- 句子向量：字符二元组 TF-IDF，余弦相似度矩阵上做 TextRank
+- 有 NumPy 时用矩阵运算，否则退回纯 Python 实现
+- 列表项、小标题等残句不参与摘要；近似重复的句子只取一句
+- 按原文顺序拼接得分最高的句子，截断到公众号摘要长度（120 字）
+- 批量模式：为产物存储中的历史运行补写摘要
+
+用法：
+    python article_digest.py summarize article.md
+    python article_digest.py archive [--force] [--json]
+"""
+
+import argparse
+import json
+import math
+import re
+import sys
+import time
+from pathlib import Path
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+from artifact_store import DEFAULT_ROOT, ArtifactStore
+
+# 公众号摘要上限
+DIGEST_MAX_CHARS = 120
+# 只取前若干个句子参与排序，保证长文也在毫秒级完成
+MAX_SENTENCES = 200
+MIN_SENTENCE_CHARS = 8
+DAMPING = 0.85
+MAX_ITERATIONS = 50
+# 与已选句子的二元组余弦相似度（不加 IDF 权重）达到该值时视为重复
+DUPLICATE_SIMILARITY = 0.7
+# 得分保留的小数位：两种实现的浮点误差在此之下，同分时统一按句子顺序排列
+SCORE_DECIMALS = 9
+
+FENCE_RE = re.compile(r'^ {0,3}(`{3,}|~{3,})')
+IMAGE_RE = re.compile(r'!\[[^\[\]\n]*\]\([^()\n]*\)')
+LINK_RE = re.compile(r'\[([^\[\]\n]*)\]\([^()\n]*\)')
+HTML_TAG_RE = re.compile(r'<[^<>]*>')
+BLOCK_PREFIX_RE = re.compile(r'^\s*(?:>\s*)*(?P<list>[-*+]\s+|\d+[.)]\s+)?')
+INLINE_MARK_RE = re.compile(r'[*_`~]+|\[\^[^\]\n]*\]')
+# 句子：到句末标点（可带收尾引号/括号）为止，或到行尾
+SENTENCE_RE = re.compile(r'[^。！？!?；;…\n]+(?:[。！？!?；;…]+[”’」』）)"]*)?')
+SENTENCE_END_RE = re.compile(r'[。！？!?；;…][”’」』）)"]*$')
+TOKEN_RE = re.compile(r'[A-Za-z0-9]+|[^\sA-Za-z0-9，。！？、；：“”‘’（）《》「」『』,.!?;:()\[\]"\'…—-]')
+
+
+def markdown_to_text(content: str) -> str:
+    """去掉 frontmatter、代码块、标题、表格、图片和标记，只保留正文文字（按行）
+
+    没有句末标点的列表项（要点短语）一并去掉，完整成句的列表项保留
+    """
+    lines = content.split('\n')
+    if lines and lines[0] == '---':
+        for i in range(1, len(lines)):
+            if lines[i] == '---':
+                lines = lines[i + 1:]
+                break
+
+    out = []
+    fence = None
+    for line in lines:
+        match = FENCE_RE.match(line)
+        if fence:
+            if match and match.group(1)[0] == fence[0] and len(match.group(1)) >= len(fence):
+                fence = None
+            continue
+        if match:
+            fence = match.group(1)
+            continue
+        stripped = line.strip()
+        if not stripped or stripped.startswith(('#', '|', '[^')) or set(stripped) <= set('-*_= '):
+            continue
+        line = IMAGE_RE.sub('', line)
+        line = LINK_RE.sub(r'\1', line)
+        line = HTML_TAG_RE.sub('', line)
+        prefix = BLOCK_PREFIX_RE.match(line)
+        line = INLINE_MARK_RE.sub('', line[prefix.end():]).strip()
+        if not line or (prefix.group('list') and not SENTENCE_END_RE.search(line)):
+            continue
+        out.append(line)
+    return '\n'.join(out)
+
+
+def split_sentences(text: str) -> list:
+    """按中文句末标点切分句子，过短的句子（小标题、残句）和重复句丢弃，没有句末标点的补「。」"""
+    sentences = []
+    seen = set()
+    for match in SENTENCE_RE.finditer(text):
+        sentence = match.group().strip()
+        if len(sentence) < MIN_SENTENCE_CHARS or sentence in seen:
+            continue
+        seen.add(sentence)
+        if not SENTENCE_END_RE.search(sentence):
+            sentence = sentence.rstrip('，、：,:') + '。'
+        sentences.append(sentence)
+        if len(sentences) >= MAX_SENTENCES:
+            break
+    return sentences
+
+
+def sentence_ngrams(sentence: str) -> list:
+    """字符二元组（英文单词、数字整体作为一个字符）"""
+    tokens = TOKEN_RE.findall(sentence.lower())
+    if len(tokens) < 2:
+        return tokens
+    return [a + '\0' + b for a, b in zip(tokens, tokens[1:])]
+
+
+def _textrank_numpy(grams: list) -> tuple[list, "np.ndarray"]:
+    vocab = {}
+    rows, cols = [], []
+    for i, items in enumerate(grams):
+        for gram in items:
+            rows.append(i)
+            cols.append(vocab.setdefault(gram, len(vocab)))
+    n = len(grams)
+    tf = np.zeros((n, len(vocab)), dtype=np.float64)
+    np.add.at(tf, (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)), 1.0)
+
+    tf_norms = np.linalg.norm(tf, axis=1, keepdims=True)
+    raw = tf / np.where(tf_norms == 0, 1.0, tf_norms)
+    overlap = raw @ raw.T
+    np.fill_diagonal(overlap, 0.0)
+
+    df = np.count_nonzero(tf, axis=0)
+    vectors = tf * (np.log((1 + n) / (1 + df)) + 1.0)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors /= np.where(norms == 0, 1.0, norms)
+
+    similarity = vectors @ vectors.T
+    np.fill_diagonal(similarity, 0.0)
+    out_weight = similarity.sum(axis=1, keepdims=True)
+    transition = np.divide(similarity, out_weight, out=np.zeros_like(similarity), where=out_weight > 0)
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(MAX_ITERATIONS):
+        updated = (1 - DAMPING) / n + DAMPING * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < 1e-6:
+            scores = updated
+            break
+        scores = updated
+    return scores.tolist(), overlap
+
+
+def _cosine(a: dict, b: dict) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b[g] for g, v in a.items() if g in b)
+
+
+def _unit(vec: dict) -> dict:
+    norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+    return {g: v / norm for g, v in vec.items()}
+
+
+def _textrank_python(grams: list) -> tuple[list, list]:
+    n = len(grams)
+    counts = []
+    df = {}
+    for items in grams:
+        tf = {}
+        for gram in items:
+            tf[gram] = tf.get(gram, 0) + 1
+        counts.append(tf)
+        for gram in tf:
+            df[gram] = df.get(gram, 0) + 1
+
+    vectors = [_unit({g: c * (math.log((1 + n) / (1 + df[g])) + 1.0) for g, c in tf.items()}) for tf in counts]
+    raw = [_unit(tf) for tf in counts]
+
+    similarity = [[0.0] * n for _ in range(n)]
+    overlap = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(i + 1, n):
+            similarity[i][j] = similarity[j][i] = _cosine(vectors[i], vectors[j])
+            overlap[i][j] = overlap[j][i] = _cosine(raw[i], raw[j])
+    out_weight = [sum(row) for row in similarity]
+
+    scores = [1.0 / n] * n
+    for _ in range(MAX_ITERATIONS):
+        updated = [
+            (1 - DAMPING) / n + DAMPING * sum(
+                similarity[j][i] / out_weight[j] * scores[j] for j in range(n) if out_weight[j] > 0)
+            for i in range(n)
+        ]
+        delta = sum(abs(u - s) for u, s in zip(updated, scores))
+        scores = updated
+        if delta < 1e-6:
+            break
+    return scores, overlap
+
+
+def rank_sentences(sentences: list) -> tuple:
+    """TextRank 得分（与句子一一对应，保留 SCORE_DECIMALS 位小数）和句子间二元组余弦相似度矩阵（不加权，对角线为 0）
+
+    排序用 TF-IDF 加权的相似度；查重用不加权的相似度，长文中反复出现的句子 IDF 低，加权后反而显得不相似
+    """
+    if len(sentences) < 2:
+        return [1.0] * len(sentences), [[0.0] * len(sentences) for _ in sentences]
+    grams = [sentence_ngrams(s) for s in sentences]
+    scores, overlap = _textrank_numpy(grams) if HAS_NUMPY else _textrank_python(grams)
+    return [round(score, SCORE_DECIMALS) for score in scores], overlap
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars - 1]
+    # 尽量在逗号、顿号处截断
+    for mark in '，、；,;':
+        pos = cut.rfind(mark)
+        if pos >= max_chars // 2:
+            cut = cut[:pos]
+            break
+    return cut + '…'
+
+
+def summarize(content: str, max_chars: int = DIGEST_MAX_CHARS) -> str:
+    """从 Markdown 正文抽取摘要，正文没有可用句子时返回空字符串"""
+    sentences = split_sentences(markdown_to_text(content))
+    if not sentences:
+        return ''
+    scores, similarity = rank_sentences(sentences)
+    # 同分时靠前的句子优先（导语通常概括全文）；两种实现在同分时结果一致
+    order = sorted(range(len(sentences)), key=lambda i: (-scores[i], i))
+
+    chosen = []
+    length = 0
+    for i in order:
+        if any(similarity[i][j] >= DUPLICATE_SIMILARITY for j in chosen):
+            continue
+        if length + len(sentences[i]) <= max_chars:
+            chosen.append(i)
+            length += len(sentences[i])
+        elif not chosen:
+            return _truncate(sentences[i], max_chars)
+        if length >= max_chars * 0.8:
+            break
+    return ''.join(sentences[i] for i in sorted(chosen))
+
+
+def summarize_archive(store: ArtifactStore, force: bool = False) -> list:
+    """为产物存储中带原文的运行写入摘要，返回 [{run_id, title, digest}]"""
+    results = []
+    for manifest in store.list_runs():
+        if "original.md" not in manifest.get("artifacts", {}):
+            continue
+        if manifest.get("digest") and not force:
+            continue
+        run = store.load_run(manifest["run_id"])
+        content = store.read_artifact(run.run_id, "original.md").decode('utf-8', errors='replace')
+        digest = summarize(content)
+        run.set("digest", digest)
+        results.append({"run_id": run.run_id, "title": manifest.get("title", ""), "digest": digest})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='文章摘要（本地抽取式）')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_file = sub.add_parser('summarize', help='为 Markdown 文件生成摘要')
+    p_file.add_argument('input', help='Markdown 文件路径')
+    p_file.add_argument('--max-chars', type=int, default=DIGEST_MAX_CHARS,
+                        help=f'摘要长度上限（默认 {DIGEST_MAX_CHARS}）')
+
+    p_archive = sub.add_parser('archive', help='为产物存储中的历史运行批量生成摘要')
+    p_archive.add_argument('--root', default=DEFAULT_ROOT, help=f'存储目录（默认 {DEFAULT_ROOT}）')
+    p_archive.add_argument('--force', action='store_true', help='已有摘要的运行也重新生成')
+    p_archive.add_argument('--json', action='store_true', help='输出 JSON 格式')
+
+    args = parser.parse_args()
+    start = time.perf_counter()
+
+    if args.command == 'summarize':
+        path = Path(args.input)
+        if not path.exists():
+            print(f"❌ 文件不存在: {path}")
+            sys.exit(1)
+        digest = summarize(path.read_text(encoding='utf-8'), args.max_chars)
+        elapsed = (time.perf_counter() - start) * 1000
+        if not digest:
+            print("❌ 正文中没有可用于摘要的句子")
+            sys.exit(1)
+        print(digest)
+        print(f"📝 {len(digest)} 字，耗时 {elapsed:.1f} ms")
+    elif args.command == 'archive':
+        results = summarize_archive(ArtifactStore(args.root), args.force)
+        elapsed = (time.perf_counter() - start) * 1000
+        if args.json:
+            print(json.dumps(results, ensure_ascii=False, indent=2))
+            return
+        for item in results:
+            print(f"{item['run_id']}\t{item['title']}\t{item['digest']}")
+        print(f"✅ 已生成 {len(results)} 篇摘要，耗时 {elapsed:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
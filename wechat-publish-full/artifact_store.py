@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+发布产物存储（内容寻址）
+
+功能：替代 wechat_output 下按标题命名的平铺文件
+- 产物按 SHA-256 内容寻址，相同内容只存一份（重试不会重复写盘）
+- 文本产物（.md/.html/.json）透明 gzip 压缩，图片原样存储
+- 每次运行一个清单（manifest），记录产物名 → 内容哈希
+- 保留策略与垃圾回收：按天数、总大小清理旧运行，并删除无引用的内容
+- 每次运行独占一个临时工作目录；所有写入先写临时文件再改名；共享文件用文件锁保护
+
+目录结构：
+    <root>/objects/ab/abcdef....gz   内容对象
+    <root>/runs/<run_id>.json        运行清单
+    <root>/tmp/<run_id>/             运行中的临时文件（结束后删除）
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+DEFAULT_ROOT = "/root/.openclaw/workspace/wechat_output/store"
+
+# 需要压缩的文本产物后缀
+TEXT_SUFFIXES = {'.md', '.html', '.htm', '.json', '.txt', '.css'}
+
+# 超过该时长的运行工作目录视为崩溃残留，gc 时删除
+STALE_WORKSPACE_SECONDS = 24 * 3600
+
+
+def atomic_write_bytes(path: Path, data: bytes):
+    """先写临时文件再改名，避免其他进程读到半截内容"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{uuid.uuid4().hex[:6]}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+@contextmanager
+def file_lock(path, shared: bool = False):
+    """跨进程文件锁（flock）：shared=True 为读锁，可与其他读锁共存
+
+    同一进程内的不同线程各自打开锁文件，同样互斥；没有 fcntl 的平台不加锁
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a') as f:
+        if HAS_FCNTL:
+            fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if HAS_FCNTL:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class ArtifactRun:
+    """单次运行的产物清单，每次写入产物都会原子更新清单文件"""
+
+    def __init__(self, store: "ArtifactStore", run_id: str, manifest: dict):
+        self.store = store
+        self.run_id = run_id
+        self.manifest = manifest
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.store.runs_dir / f"{self.run_id}.json"
+
+    def put(self, name: str, data) -> Path:
+        """写入产物（str 或 bytes），返回内容对象路径"""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        digest, path, stored = self.store.put_blob(data, Path(name).suffix)
+        self.manifest["artifacts"][name] = {
+            "digest": digest,
+            "size": len(data),
+            "stored_size": stored,
+            "object": str(path.relative_to(self.store.root)),
+        }
+        self.save()
+        return path
+
+    def put_file(self, name: str, file_path) -> Path:
+        """把已有文件写入产物存储"""
+        return self.put(name, Path(file_path).read_bytes())
+
+    @contextmanager
+    def workspace(self):
+        """本次运行独占的临时目录（<root>/tmp/<run_id>/），退出时删除"""
+        path = self.store.tmp_dir / self.run_id
+        path.mkdir(parents=True, exist_ok=True)
+        try:
+            yield path
+        finally:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def set(self, key: str, value):
+        """记录运行的附加信息（如状态、标题）"""
+        self.manifest[key] = value
+        self.save()
+
+    def save(self):
+        data = json.dumps(self.manifest, ensure_ascii=False, indent=2).encode('utf-8')
+        atomic_write_bytes(self.manifest_path, data)
+
+
+class ArtifactStore:
+    """内容寻址的产物存储"""
+
+    def __init__(self, root=DEFAULT_ROOT):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.runs_dir = self.root / "runs"
+        self.tmp_dir = self.root / "tmp"
+
+    # ---- 内容对象 ----
+
+    def object_path(self, digest: str, suffix: str) -> Path:
+        compressed = suffix.lower() in TEXT_SUFFIXES
+        name = f"{digest}.gz" if compressed else f"{digest}{suffix}"
+        return self.objects_dir / digest[:2] / name
+
+    def put_blob(self, data: bytes, suffix: str = "") -> tuple:
+        """写入内容对象，已存在则跳过；返回 (哈希, 对象路径, 占用字节数)"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.object_path(digest, suffix)
+        if path.exists():
+            # 刷新 mtime，避免并发的 gc 在清单写入前把它当作无引用对象删除
+            os.utime(path)
+            return digest, path, path.stat().st_size
+
+        if path.suffix == '.gz':
+            payload = gzip.compress(data, compresslevel=6, mtime=0)
+        else:
+            payload = data
+        atomic_write_bytes(path, payload)
+        return digest, path, len(payload)
+
+    def read_blob(self, object_rel: str) -> bytes:
+        path = self.root / object_rel
+        data = path.read_bytes()
+        return gzip.decompress(data) if path.suffix == '.gz' else data
+
+    # ---- 运行清单 ----
+
+    def new_run(self, title: str = "", **fields) -> ArtifactRun:
+        """创建新的运行清单（fields 为附加信息，如主题风格、选题）"""
+        run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        manifest = {"run_id": run_id, "title": title, "created": time.time(), **fields, "artifacts": {}}
+        run = ArtifactRun(self, run_id, manifest)
+        run.save()
+        return run
+
+    def load_run(self, run_id: str) -> ArtifactRun:
+        path = self.runs_dir / f"{run_id}.json"
+        return ArtifactRun(self, run_id, json.loads(path.read_text(encoding='utf-8')))
+
+    def iter_runs(self):
+        """逐个读取运行清单（不排序，不整体载入内存）"""
+        if not self.runs_dir.exists():
+            return
+        with os.scandir(self.runs_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    with open(entry.path, encoding='utf-8') as f:
+                        yield json.load(f)
+                except (OSError, ValueError):
+                    continue
+
+    def list_runs(self) -> list:
+        """按创建时间从新到旧列出所有运行清单"""
+        manifests = list(self.iter_runs())
+        manifests.sort(key=lambda m: m.get("created", 0), reverse=True)
+        return manifests
+
+    def read_artifact(self, run_id: str, name: str) -> bytes:
+        entry = self.load_run(run_id).manifest["artifacts"][name]
+        return self.read_blob(entry["object"])
+
+    # ---- 保留策略 ----
+
+    def gc(self, max_age_days: float = None, max_size_mb: float = None, dry_run: bool = False,
+           grace_seconds: float = 3600) -> dict:
+        """清理过期运行并回收无引用的内容对象
+
+        1. 删除早于 max_age_days 的运行清单
+        2. 仍超过 max_size_mb 时，从最旧的运行开始删除（按内容对象引用计数增量统计，只遍历一次）
+        3. 删除不再被任何清单引用、且超过 grace_seconds 未写入的内容对象
+           （保护正在运行、尚未写入清单的产物）
+        4. 删除超过 STALE_WORKSPACE_SECONDS 的运行工作目录（进程被杀后的残留）
+        """
+        runs = self.list_runs()
+        now = time.time()
+        keep, drop = [], []
+        for manifest in runs:
+            if max_age_days is not None and now - manifest.get("created", 0) > max_age_days * 86400:
+                drop.append(manifest)
+            else:
+                keep.append(manifest)
+
+        if max_size_mb is not None:
+            limit = max_size_mb * 1024 * 1024
+            refcount, sizes = {}, {}
+            for manifest in keep:
+                for obj, size in self._run_objects(manifest).items():
+                    refcount[obj] = refcount.get(obj, 0) + 1
+                    sizes[obj] = size
+            total = sum(sizes.values())
+            # keep 按从新到旧排列，从末尾逐个删除最旧的运行，对象引用归零时才扣除其大小
+            while keep and total > limit:
+                manifest = keep.pop()
+                drop.append(manifest)
+                for obj in self._run_objects(manifest):
+                    refcount[obj] -= 1
+                    if not refcount[obj]:
+                        total -= sizes[obj]
+
+        referenced = {a["object"] for m in keep for a in m.get("artifacts", {}).values()}
+        orphans = []
+        if self.objects_dir.exists():
+            for path in self.objects_dir.glob("*/*"):
+                if path.name.endswith(".tmp"):
+                    continue
+                if str(path.relative_to(self.root)) in referenced:
+                    continue
+                if now - path.stat().st_mtime < grace_seconds:
+                    continue
+                orphans.append(path)
+
+        stale = []
+        if self.tmp_dir.exists():
+            stale = [p for p in self.tmp_dir.iterdir()
+                     if p.is_dir() and now - p.stat().st_mtime > STALE_WORKSPACE_SECONDS]
+
+        freed = sum(p.stat().st_size for p in orphans)
+        if not dry_run:
+            for manifest in drop:
+                (self.runs_dir / f"{manifest['run_id']}.json").unlink(missing_ok=True)
+            for path in orphans:
+                path.unlink(missing_ok=True)
+            for path in stale:
+                shutil.rmtree(path, ignore_errors=True)
+
+        return {"runs_removed": len(drop), "runs_kept": len(keep),
+                "objects_removed": len(orphans), "bytes_freed": freed,
+                "workspaces_removed": len(stale)}
+
+    @staticmethod
+    def _run_objects(manifest: dict) -> dict:
+        """运行引用的内容对象 {对象路径: 存储大小}（同一对象只计一次）"""
+        return {entry["object"]: entry.get("stored_size", entry.get("size", 0))
+                for entry in manifest.get("artifacts", {}).values()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='发布产物存储管理')
+    parser.add_argument('--root', default=DEFAULT_ROOT, help=f'存储目录（默认 {DEFAULT_ROOT}）')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    sub.add_parser('list', help='列出运行记录')
+
+    p_show = sub.add_parser('show', help='查看运行清单')
+    p_show.add_argument('run_id')
+
+    p_export = sub.add_parser('export', help='导出某次运行的产物')
+    p_export.add_argument('run_id')
+    p_export.add_argument('output_dir')
+
+    p_gc = sub.add_parser('gc', help='按保留策略清理')
+    p_gc.add_argument('--max-age-days', type=float, default=None, help='保留天数')
+    p_gc.add_argument('--max-size-mb', type=float, default=None, help='存储总大小上限（MB）')
+    p_gc.add_argument('--dry-run', action='store_true', help='只统计不删除')
+    p_gc.add_argument('--grace-seconds', type=float, default=3600, help='最近写入的无引用对象保护时长（秒）')
+
+    args = parser.parse_args()
+    store = ArtifactStore(args.root)
+
+    if args.command == 'list':
+        for manifest in store.list_runs():
+            created = time.strftime('%Y-%m-%d %H:%M', time.localtime(manifest.get("created", 0)))
+            names = ", ".join(manifest.get("artifacts", {}))
+            print(f"{manifest['run_id']}\t{created}\t{manifest.get('status', '')}\t{manifest.get('title', '')}\t{names}")
+    elif args.command == 'show':
+        print(json.dumps(store.load_run(args.run_id).manifest, ensure_ascii=False, indent=2))
+    elif args.command == 'export':
+        output_dir = Path(args.output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        for name in store.load_run(args.run_id).manifest["artifacts"]:
+            atomic_write_bytes(output_dir / name, store.read_artifact(args.run_id, name))
+            print(f"✅ 已导出: {output_dir / name}")
+    elif args.command == 'gc':
+        if args.max_age_days is None and args.max_size_mb is None:
+            print("❌ 请指定 --max-age-days 或 --max-size-mb")
+            sys.exit(1)
+        stats = store.gc(args.max_age_days, args.max_size_mb, args.dry_run, args.grace_seconds)
+        prefix = "🔍 预计" if args.dry_run else "✅ 已"
+        print(f"{prefix}清理运行 {stats['runs_removed']} 个（保留 {stats['runs_kept']}），"
+              f"内容对象 {stats['objects_removed']} 个，残留工作目录 {stats['workspaces_removed']} 个，"
+              f"释放 {stats['bytes_freed'] / 1024:.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
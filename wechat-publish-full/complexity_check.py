@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+HTML/Markdown 后处理最坏情况复杂度检查
+
+功能：用对抗语料和随机模糊语料测量各后处理函数的耗时随输入规模的增长
+- 对抗语料：未闭合的 <p>/<li>/<style>/代码块/警告框、缺少 > 的标签、长空白、连续反引号等
+- 模糊语料：按固定种子随机拼接上述片段与正常文章片段
+- 每个函数在每份语料上按多个规模计时，拟合 log(耗时) ~ log(规模) 的斜率
+- 斜率超过阈值（默认 1.3，线性为 1）即判定为超线性，退出码 1
+- 任一检查目标无法加载时同样退出码 1，不会在缺少模块时静默通过
+
+用法：
+    python complexity_check.py                 # 检查全部函数
+    python complexity_check.py -v              # 显示每份语料的斜率
+    python complexity_check.py --only fix_html_for_wechat
+    python complexity_check.py --tools-dir /root/.openclaw/workspace/tools
+"""
+
+import argparse
+import contextlib
+import io
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+# 对抗片段：重复拼接到目标长度
+ADVERSARIAL_UNITS = {
+    'unclosed_p': '<p>段落 text ',
+    'unclosed_li': '<li class="item">列表项 ',
+    'unclosed_heading': '<h2 id="t">标题 ',
+    'unclosed_strong': '<strong>加粗 ',
+    'unclosed_code': '<code>x = 1 ',
+    'unclosed_style': '<style>p { color: red; } ',
+    'unclosed_code_block': '<pre><code class="python">x = 1\n',
+    'unclosed_alert': '<blockquote>\n<p>[!NOTE]\n内容</p>\n',
+    'nested_blockquote': '<blockquote>\n<p>[!TIP] ',
+    'tags_without_gt': '<h1<p<li<img<code<pre<style<th ',
+    'img_without_gt': '<img src="a.png" alt="图" ',
+    'p_gap': '</p>   \n   ',
+    'br_gap': '<br>    \n    ',
+    'blank_lines': '\n\n\n\n',
+    'backticks': '`代码abc ',
+    'link_without_paren': '[链接](http://a.com/中文 ',
+    'cjk_latin': '中文abc英文123',
+    'cjk_bang': '中!!',
+    'fullwidth_run': '！！？？',
+    'cjk_spaces': '中      ',
+    'fence_open': '```python\n中文abc\n',
+    'footnote_like': '[^脚注 ',
+    'heading_lines': '# 中文 Title\n',
+}
+
+# 正常文章片段（Markdown 渲染后的典型 HTML 与原文）
+NORMAL_UNITS = [
+    '<h2>小标题</h2>\n<p>这是一段正常的段落，包含 <strong>加粗</strong> 和 <code>code</code>。</p>\n',
+    '<ul>\n<li>第一项</li>\n<li>第二项</li>\n</ul>\n',
+    '<table>\n<thead>\n<tr><th>列</th></tr>\n</thead>\n<tbody><tr><td>值</td></tr></tbody>\n</table>\n',
+    '<pre><code class="python">print("hello")\n</code></pre>\n',
+    '<blockquote>\n<p>[!NOTE]\n提示内容</p>\n</blockquote>\n',
+    '<p><img src="a.png" alt="图"></p>\n<hr>\n',
+    '## 标题\n\n使用Python开发,效果很好!!!详见[文档](https://example.com)。\n\n',
+    '```\ncode中文\n```\n\n- 列表项abc\n',
+]
+
+FUZZ_SEEDS = (1, 2, 3)
+
+DEFAULT_SIZES = (2000, 4000, 8000, 16000, 32000)
+DEFAULT_MAX_EXPONENT = 1.3
+# 单次调用超过该耗时（秒）直接判定失败，不再测更大的规模
+CALL_BUDGET = 2.0
+# 最大规模耗时低于该值（秒）时斜率只反映计时噪声，不判定失败
+MIN_SIGNIFICANT = 0.001
+# markdown-to-html 所在目录：部署后与本脚本同在 tools/ 下，源码仓库中为同级技能目录
+_HERE = Path(__file__).resolve().parent
+DEFAULT_TOOLS_DIR = _HERE if (_HERE / 'markdown_to_html.py').exists() else _HERE.parent / 'markdown-to-html'
+
+
+def build_corpus() -> dict:
+    """返回 {语料名: 生成函数(目标长度) -> str}"""
+    corpus = {}
+    for name, unit in ADVERSARIAL_UNITS.items():
+        corpus[name] = lambda size, unit=unit: unit * max(1, size // len(unit))
+    corpus['normal'] = lambda size: ''.join(NORMAL_UNITS) * max(1, size // len(''.join(NORMAL_UNITS)))
+
+    pieces = list(ADVERSARIAL_UNITS.values()) + NORMAL_UNITS
+    for seed in FUZZ_SEEDS:
+        def fuzz(size, seed=seed):
+            rng = random.Random(seed)
+            parts, length = [], 0
+            while length < size:
+                piece = rng.choice(pieces)
+                parts.append(piece)
+                length += len(piece)
+            return ''.join(parts)
+        corpus[f'fuzz-{seed}'] = fuzz
+    return corpus
+
+
+def load_targets(tools_dir: Path = DEFAULT_TOOLS_DIR) -> tuple:
+    """收集需要检查的后处理函数，返回 ({名称: 函数(str)}, [无法加载的模块说明])"""
+    from optimize_wechat_html import optimize_wechat_html
+    targets = {'optimize_wechat_html.optimize_wechat_html': optimize_wechat_html}
+    errors = []
+
+    try:
+        import wechat_publish_full as publisher
+        targets['wechat_publish_full.optimize_wechat_html'] = publisher.optimize_wechat_html
+        targets['wechat_publish_full.fix_html_for_wechat'] = publisher.fix_html_for_wechat
+        targets['wechat_publish_full.MarkdownBlockSplitter'] = lambda text: (
+            list(publisher.MarkdownBlockSplitter().feed(text)))
+    except Exception as e:
+        errors.append(f"wechat_publish_full: {e}")
+
+    try:
+        if not (tools_dir / 'markdown_to_html.py').exists():
+            raise FileNotFoundError(f"{tools_dir} 下没有 markdown_to_html.py")
+        sys.path.insert(0, str(tools_dir))
+        from markdown_to_html import convert_alerts, highlight_code_blocks, parse_frontmatter
+        from cjk_typography import normalize_typography
+        targets['markdown_to_html.convert_alerts'] = convert_alerts
+        targets['markdown_to_html.highlight_code_blocks'] = highlight_code_blocks
+        targets['markdown_to_html.parse_frontmatter'] = lambda text: parse_frontmatter('---\n' + text)
+        targets['cjk_typography.normalize_typography'] = normalize_typography
+    except Exception as e:
+        errors.append(f"markdown-to-html: {e}")
+
+    return targets, errors
+
+
+def _time_call(func, text: str, loops: int) -> float:
+    """多次调用取最快的一轮，返回单次平均耗时（秒）"""
+    best = None
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func(text)
+        elapsed = (time.perf_counter() - start) / loops
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _slope(sizes, timings) -> float:
+    """log(耗时) 对 log(规模) 的最小二乘斜率"""
+    xs = [math.log(s) for s in sizes]
+    ys = [math.log(max(t, 1e-9)) for t in timings]
+    mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+    var = sum((x - mx) ** 2 for x in xs)
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / var
+
+
+def measure(func, generate, sizes) -> dict:
+    """测量一个函数在一份语料上的增长斜率"""
+    texts = [generate(size) for size in sizes]
+    # 以最小规模校准循环次数，保证每轮至少约 5 ms，减小计时噪声
+    single = _time_call(func, texts[0], 1)
+    loops = max(1, min(200, int(0.005 / max(single, 1e-7))))
+
+    timings = []
+    for text in texts:
+        elapsed = _time_call(func, text, loops)
+        timings.append(elapsed)
+        if elapsed > CALL_BUDGET:
+            return {'slope': math.inf, 'timings': timings, 'lengths': [len(t) for t in texts]}
+    return {'slope': _slope([len(t) for t in texts], timings), 'timings': timings,
+            'lengths': [len(t) for t in texts]}
+
+
+def check(targets: dict, sizes=DEFAULT_SIZES, max_exponent: float = DEFAULT_MAX_EXPONENT,
+          verbose: bool = False) -> dict:
+    """检查全部函数，返回 {函数名: [(语料名, 斜率, 最大规模耗时 ms)] 中超过阈值的项}"""
+    corpus = build_corpus()
+    failures = {}
+    for name, func in targets.items():
+        failures[name] = []
+        worst = (None, 0.0)
+        for corpus_name, generate in corpus.items():
+            # 被测函数会打印进度，计时时屏蔽输出
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = measure(func, generate, sizes)
+            slope = result['slope']
+            last_ms = result['timings'][-1] * 1000
+            significant = result['timings'][-1] >= MIN_SIGNIFICANT
+            if significant and slope > worst[1]:
+                worst = (corpus_name, slope)
+            if verbose:
+                print(f"   {name} [{corpus_name}] 斜率 {slope:.2f}，{result['lengths'][len(result['timings']) - 1]} 字符 {last_ms:.2f} ms")
+            if significant and slope > max_exponent:
+                failures[name].append((corpus_name, slope, last_ms))
+
+        if failures[name]:
+            detail = ', '.join(f"{c}（斜率 {s:.2f}，{ms:.1f} ms）" for c, s, ms in failures[name])
+            print(f"❌ {name}: 超线性 {detail}")
+        elif worst[0] is None:
+            print(f"✅ {name}: 各语料耗时均低于 {MIN_SIGNIFICANT * 1000:.0f} ms")
+        else:
+            print(f"✅ {name}: 最大斜率 {worst[1]:.2f}（{worst[0]}）")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HTML/Markdown 后处理最坏情况复杂度检查')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='输入规模（字符数，逗号分隔）')
+    parser.add_argument('--max-exponent', type=float, default=DEFAULT_MAX_EXPONENT,
+                        help=f'允许的最大增长斜率（默认 {DEFAULT_MAX_EXPONENT}，线性为 1）')
+    parser.add_argument('--only', action='append', help='只检查名称中包含该字符串的函数（可重复）')
+    parser.add_argument('--tools-dir', type=Path, default=DEFAULT_TOOLS_DIR,
+                        help=f'markdown-to-html 技能目录（默认 {DEFAULT_TOOLS_DIR}）')
+    parser.add_argument('-v', '--verbose', action='store_true', help='显示每份语料的斜率')
+    args = parser.parse_args()
+
+    sizes = sorted(int(s) for s in args.sizes.split(',') if s.strip())
+    if len(sizes) < 2:
+        print("❌ 至少需要两个规模")
+        sys.exit(1)
+
+    targets, errors = load_targets(args.tools_dir)
+    for error in errors:
+        print(f"❌ 无法加载 {error}")
+    if args.only:
+        targets = {name: func for name, func in targets.items() if any(key in name for key in args.only)}
+    print(f"📊 {len(targets)} 个函数 × {len(build_corpus())} 份语料，规模 {sizes}")
+
+    failures = check(targets, sizes, args.max_exponent, args.verbose)
+    sys.exit(1 if errors or any(failures.values()) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+本地封面渲染
+
+功能：毫秒级生成 900x383 的公众号封面（渐变背景 + 标题），不依赖图片生成接口
+- 配色随主题（default/simple/grace，自定义主题按名称挑选配色）
+- 自动查找中文字体，按宽度折行，标题过长时缩小字号，最多三行
+- 按 标题 + 主题 缓存，同一篇文章重发时封面字节不变（可复用已上传的素材）
+
+用法：
+    python cover_renderer.py "文章标题" --theme grace -o cover.jpg
+"""
+
+import argparse
+import hashlib
+import io
+import os
+import re
+import shutil
+import sys
+import zlib
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFont
+
+from artifact_store import atomic_write_bytes
+
+COVER_SIZE = (900, 383)
+COVER_CACHE_DIR = Path(os.environ.get("COVER_CACHE_DIR", "/root/.openclaw/workspace/.cache/covers"))
+# 绘制逻辑变化时递增，使旧缓存失效
+RENDERER_VERSION = 2
+
+# 主题配色：(渐变起点, 渐变终点, 文字颜色)
+THEME_PALETTES = {
+    'default': ((102, 126, 234), (118, 75, 162), (255, 255, 255)),
+    'simple': ((31, 41, 55), (55, 65, 81), (243, 244, 246)),
+    'grace': ((252, 203, 144), (213, 126, 235), (255, 255, 255)),
+}
+EXTRA_PALETTES = [
+    ((67, 206, 162), (24, 90, 157), (255, 255, 255)),
+    ((255, 95, 109), (255, 195, 113), (255, 255, 255)),
+    ((33, 147, 176), (109, 213, 237), (255, 255, 255)),
+]
+
+# 常见中文字体位置；可用 COVER_FONT 环境变量指定
+FONT_CANDIDATES = [
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Bold.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Bold.ttc",
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/google-noto-cjk/NotoSansCJK-Bold.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",
+    "/usr/share/fonts/wqy-microhei/wqy-microhei.ttc",
+    "/usr/share/fonts/adobe-source-han-sans/SourceHanSansCN-Bold.otf",
+    "/System/Library/Fonts/PingFang.ttc",
+    "/System/Library/Fonts/STHeiti Medium.ttc",
+    "C:/Windows/Fonts/msyhbd.ttc",
+    "C:/Windows/Fonts/msyh.ttc",
+]
+
+MAX_LINES = 3
+FONT_SIZES = (60, 52, 44, 38)
+PADDING_X = 72
+
+# 折行单位：英文单词/数字整体，其他字符逐个
+WRAP_TOKEN_RE = re.compile(r'[A-Za-z0-9][A-Za-z0-9.\-_]*|\s+|.')
+
+
+@lru_cache(maxsize=None)
+def find_font_path() -> str:
+    """查找可用的中文字体，找不到返回空字符串"""
+    candidates = [os.environ.get("COVER_FONT", "")] + FONT_CANDIDATES
+    for path in candidates:
+        if path and Path(path).exists():
+            return path
+    return ""
+
+
+@lru_cache(maxsize=None)
+def load_font(size: int):
+    path = find_font_path()
+    if path:
+        # 标题不需要复杂排版（连字、双向文本），BASIC 布局比 raqm 快一个数量级
+        return ImageFont.truetype(path, size, layout_engine=ImageFont.Layout.BASIC)
+    return None
+
+
+def palette_for(theme: str) -> tuple:
+    if theme in THEME_PALETTES:
+        return THEME_PALETTES[theme]
+    return EXTRA_PALETTES[zlib.crc32(theme.encode('utf-8')) % len(EXTRA_PALETTES)]
+
+
+@lru_cache(maxsize=4096)
+def token_width(size: int, token: str) -> float:
+    """单个折行单位的宽度（中文标题里同一个字常重复出现，按字号缓存）"""
+    return load_font(size).getlength(token)
+
+
+def _split_wide_token(token: str, size: int, max_width: int) -> list:
+    """单个单位（超长英文单词、URL）比整行还宽时按字符硬切，每段不超过 max_width"""
+    if token_width(size, token) <= max_width:
+        return [token]
+    pieces, current, current_width = [], '', 0.0
+    for char in token:
+        width = token_width(size, char)
+        if current and current_width + width > max_width:
+            pieces.append(current)
+            current, current_width = '', 0.0
+        current += char
+        current_width += width
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def wrap_title(title: str, size: int, max_width: int) -> list:
+    """按像素宽度折行（英文单词不拆开，比整行还宽的单词按字符切开），返回行列表
+
+    行宽按各单位宽度累加，不反复测量整行
+    """
+    lines, current, current_width = [], '', 0.0
+    tokens = (piece for token in WRAP_TOKEN_RE.findall(title.strip())
+              for piece in _split_wide_token(token, size, max_width))
+    for token in tokens:
+        width = token_width(size, token)
+        if current and current_width + width > max_width:
+            lines.append(current.rstrip())
+            current = token.lstrip()
+            current_width = width if current == token else token_width(size, current)
+        else:
+            current += token
+            current_width += width
+    if current.strip():
+        lines.append(current.rstrip())
+    return lines
+
+
+def fit_title(title: str, max_width: int) -> tuple:
+    """选择能在 MAX_LINES 行内放下标题的最大字号，仍放不下时截断末行，返回 (字体, 行列表)"""
+    lines = []
+    for size in FONT_SIZES:
+        lines = wrap_title(title, size, max_width)
+        if len(lines) <= MAX_LINES:
+            return load_font(size), lines
+
+    font = load_font(FONT_SIZES[-1])
+    lines = lines[:MAX_LINES]
+    last = lines[-1]
+    while last and font.getlength(last + '…') > max_width:
+        last = last[:-1]
+    lines[-1] = last + '…'
+    return font, lines
+
+
+def draw_cover(title: str, theme: str = 'default') -> Image.Image:
+    """绘制封面图"""
+    start, end, text_color = palette_for(theme)
+    width, height = COVER_SIZE
+
+    # 横向渐变：用 PIL 自带的线性渐变做蒙版，避免逐像素计算
+    mask = Image.linear_gradient('L').rotate(90).resize(COVER_SIZE)
+    image = Image.composite(Image.new('RGB', COVER_SIZE, end), Image.new('RGB', COVER_SIZE, start), mask)
+
+    # 装饰：半透明圆
+    overlay = Image.new('RGBA', COVER_SIZE, (0, 0, 0, 0))
+    deco = ImageDraw.Draw(overlay)
+    deco.ellipse((width - 260, -120, width + 120, 260), fill=(255, 255, 255, 28))
+    deco.ellipse((-90, height - 150, 170, height + 110), fill=(255, 255, 255, 20))
+    image = Image.alpha_composite(image.convert('RGBA'), overlay).convert('RGB')
+
+    if not find_font_path():
+        print("⚠️ 未找到中文字体（可设置 COVER_FONT），封面不绘制标题")
+        return image
+
+    # 文字只栅格化一次：先画到灰度蒙版，再分别贴阴影色和文字色
+    font, lines = fit_title(title, width - 2 * PADDING_X)
+    ascent, descent = font.getmetrics()
+    line_height = int((ascent + descent) * 1.25)
+    text_mask = Image.new('L', COVER_SIZE, 0)
+    draw = ImageDraw.Draw(text_mask)
+    y = (height - line_height * len(lines)) // 2
+    for line in lines:
+        draw.text(((width - font.getlength(line)) / 2, y), line, font=font, fill=255)
+        y += line_height
+
+    # 轻微阴影提高浅色背景上的可读性
+    shadow = tuple(int(c * 0.6) for c in end)
+    image.paste(Image.new('RGB', COVER_SIZE, shadow), (2, 2), text_mask)
+    image.paste(Image.new('RGB', COVER_SIZE, text_color), (0, 0), text_mask)
+    return image
+
+
+def cover_cache_path(title: str, theme: str) -> Path:
+    key = hashlib.sha256(f"{RENDERER_VERSION}\0{theme}\0{title}\0{find_font_path()}".encode('utf-8')).hexdigest()
+    return COVER_CACHE_DIR / f"{key[:32]}.jpg"
+
+
+def render_cover(title: str, theme: str = 'default', output_path: str = None) -> str:
+    """渲染（或从缓存取出）封面，返回图片路径；指定 output_path 时复制过去"""
+    cached = cover_cache_path(title, theme)
+    if not cached.exists():
+        buffer = io.BytesIO()
+        draw_cover(title, theme).save(buffer, format='JPEG', quality=90, optimize=True)
+        atomic_write_bytes(cached, buffer.getvalue())
+
+    if output_path:
+        shutil.copyfile(cached, output_path)
+        return output_path
+    return str(cached)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地封面渲染')
+    parser.add_argument('title', help='文章标题')
+    parser.add_argument('--theme', default='default', help='主题（决定配色）')
+    parser.add_argument('-o', '--output', default=None, help='输出图片路径（默认只写入缓存）')
+    args = parser.parse_args()
+
+    if not args.title.strip():
+        print("❌ 标题不能为空")
+        sys.exit(1)
+    path = render_cover(args.title, args.theme, args.output)
+    print(f"✅ 封面已生成: {path}")
+
+
+if __name__ == "__main__":
+    main()
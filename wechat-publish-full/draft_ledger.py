@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+草稿台账
+
+功能：记录每篇文章已发布的草稿，支持幂等重发
+- 文章标识（AppID + 标题，或 --article-id 指定）→ 草稿 media_id
+- 内容哈希：未变化的文章直接跳过
+- 封面哈希 → 封面 media_id：封面字节不变时不重复上传
+- SQLite 存储，多进程并发发布时安全
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+DEFAULT_DB = "/root/.openclaw/workspace/wechat_output/draft_ledger.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS drafts (
+    article_key    TEXT PRIMARY KEY,
+    app_id         TEXT NOT NULL,
+    title          TEXT,
+    draft_media_id TEXT,
+    content_hash   TEXT,
+    cover_hash     TEXT,
+    cover_media_id TEXT,
+    updated_at     REAL
+);
+CREATE INDEX IF NOT EXISTS idx_drafts_cover ON drafts(app_id, cover_hash);
+"""
+
+
+def article_key(app_id: str, title: str, article_id: str = None) -> str:
+    """文章标识：默认由 AppID + 标题决定，可用 article_id 显式指定"""
+    raw = f"{app_id}\0{article_id or title.strip()}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def content_hash(*parts: str) -> str:
+    """计算发布内容的哈希（标题、作者、HTML 等）"""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update((part or "").encode('utf-8'))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class DraftLedger:
+    """草稿台账"""
+
+    def __init__(self, db_path=DEFAULT_DB):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(db_path), timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def get(self, key: str) -> dict:
+        """按文章标识查询，不存在返回 None"""
+        cur = self.conn.execute("SELECT * FROM drafts WHERE article_key = ?", (key,))
+        row = cur.fetchone()
+        if row is None:
+            return None
+        return dict(zip([c[0] for c in cur.description], row))
+
+    def find_cover(self, app_id: str, cover_hash: str) -> str:
+        """查找同一公众号下相同字节的封面是否已上传过，返回 media_id"""
+        row = self.conn.execute(
+            "SELECT cover_media_id FROM drafts WHERE app_id = ? AND cover_hash = ? AND cover_media_id != '' "
+            "ORDER BY updated_at DESC LIMIT 1",
+            (app_id, cover_hash)
+        ).fetchone()
+        return row[0] if row else None
+
+    def record(self, key: str, app_id: str, title: str, draft_media_id: str, content_hash: str,
+               cover_hash: str = "", cover_media_id: str = ""):
+        """写入（或覆盖）一条台账记录"""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO drafts VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, app_id, title, draft_media_id, content_hash, cover_hash, cover_media_id, time.time())
+            )
+
+    def forget(self, key: str) -> bool:
+        """删除记录（草稿在后台被删除后使用）"""
+        with self.conn:
+            cur = self.conn.execute("DELETE FROM drafts WHERE article_key = ?", (key,))
+        return cur.rowcount > 0
+
+    def all(self) -> list:
+        cur = self.conn.execute("SELECT * FROM drafts ORDER BY updated_at DESC")
+        names = [c[0] for c in cur.description]
+        return [dict(zip(names, row)) for row in cur]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='草稿台账管理')
+    parser.add_argument('--db', default=DEFAULT_DB, help=f'台账数据库路径（默认 {DEFAULT_DB}）')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_list = sub.add_parser('list', help='列出已记录的草稿')
+    p_list.add_argument('--json', action='store_true', help='输出 JSON 格式')
+
+    p_forget = sub.add_parser('forget', help='删除某篇文章的记录，下次发布将新建草稿')
+    p_forget.add_argument('--app-id', required=True, help='微信公众号 AppID')
+    p_forget.add_argument('--title', default='', help='文章标题')
+    p_forget.add_argument('--article-id', default=None, help='文章标识（发布时用 --article-id 指定的）')
+
+    args = parser.parse_args()
+    ledger = DraftLedger(args.db)
+
+    if args.command == 'list':
+        rows = ledger.all()
+        if args.json:
+            print(json.dumps(rows, ensure_ascii=False, indent=2))
+            return
+        for row in rows:
+            updated = time.strftime('%Y-%m-%d %H:%M', time.localtime(row['updated_at']))
+            print(f"{updated}\t{row['title']}\t{row['draft_media_id']}")
+        print(f"📚 共 {len(rows)} 条")
+    elif args.command == 'forget':
+        if not args.title and not args.article_id:
+            print("❌ 请指定 --title 或 --article-id")
+            sys.exit(1)
+        if ledger.forget(article_key(args.app_id, args.title, args.article_id)):
+            print("✅ 已删除记录")
+        else:
+            print("❌ 未找到记录")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,110 +6,114 @@
 
 import re
 import sys
+from functools import lru_cache
 from pathlib import Path
 
+# 各标签的处理方式与内联样式：
+#   replace   整个开始标签替换为带样式的标签（原属性丢弃）
+#   bare      只处理不带属性的开始标签（如 <p>、<strong>）
+#   append    保留原属性，追加 style
+#   unstyled  只处理还没有 style 的开始标签（已高亮的代码保持不变）
+WECHAT_TAG_STYLES = {
+    # 1-3. 标题（h2 紫色渐变背景）
+    'h1': ('replace', 'font-size: 24px; font-weight: 600; margin: 24px 0 16px; color: #1a1a1a; text-align: center; border-bottom: 2px solid #007aff; padding-bottom: 12px;'),
+    'h2': ('replace', 'font-size: 20px; font-weight: 600; margin: 24px 0 12px; color: #ffffff; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 8px 16px; border-radius: 4px;'),
+    'h3': ('replace', 'font-size: 18px; font-weight: 600; margin: 20px 0 10px; color: #333333;'),
+    # 4. 普通段落
+    'p': ('bare', 'margin: 16px 0; line-height: 1.8; color: #333333;'),
+    # 5-6. 列表
+    'ul': ('replace', 'padding-left: 24px; margin: 16px 0;'),
+    'li': ('replace', 'margin: 8px 0; line-height: 1.7; color: #333333;'),
+    # 7. 表格
+    'table': ('replace', 'width: 100%; border-collapse: collapse; margin: 16px 0;'),
+    'thead': ('replace', 'background: #f5f5f5;'),
+    'th': ('append', 'padding: 10px; border: 1px solid #ddd; text-align: left; font-weight: 600;'),
+    'td': ('append', 'padding: 10px; border: 1px solid #ddd;'),
+    # 8. 引用
+    'blockquote': ('replace', 'border-left: 4px solid #667eea; padding-left: 16px; margin: 16px 0; color: #666666; background: #f9f9f9; padding: 12px 16px;'),
+    # 9. 分割线
+    'hr': ('bare', 'border: none; border-top: 1px solid #eeeeee; margin: 24px 0;'),
+    # 10. 加粗
+    'strong': ('bare', 'font-weight: 600; color: #1a1a1a;'),
+    # 11-12. 行内代码与代码块
+    'code': ('unstyled', 'background: #f5f5f5; padding: 2px 6px; border-radius: 3px; font-family: monospace;'),
+    'pre': ('unstyled', 'background: #f5f5f5; padding: 12px; border-radius: 4px; overflow-x: auto; margin: 16px 0; font-size: 14px;'),
+}
+
+VOID_TAGS = {'hr', 'img', 'br'}
+
+STYLE_OPEN_RE = re.compile(r'<style(?=[\s>])[^<>]*>')
+IMG_TAG_RE = re.compile(r'<img(?=[\s/>])([^<>]*)>')
+
+
+@lru_cache(maxsize=None)
+def _tag_pattern(names: tuple):
+    """只匹配开始标签本身：属性部分用 [^<>]*，每次尝试最多扫描到下一个 <，整体线性"""
+    return re.compile(r'<(%s)(?=[\s/>])([^<>]*)>' % '|'.join(names))
+
+
+def apply_tag_styles(html_content: str, rules: dict = None) -> str:
+    """一次扫描为开始标签加内联样式
+
+    只改写开始标签，不再用 <p>(.*?)</p> 这类成对匹配：
+    未闭合或跨行的标签不会引起回溯，跨行的段落、列表项也能加上样式。
+    """
+    rules = rules or WECHAT_TAG_STYLES
+    out = []
+    pos = 0
+    prev_name, prev_end = None, -1
+    for match in _tag_pattern(tuple(rules)).finditer(html_content):
+        name, attrs = match.group(1), match.group(2)
+        mode, style = rules[name]
+        bare = not attrs.strip(' \t\r\n/')
+
+        # 紧跟在 <pre> 后的 <code> 属于代码块，不按行内代码处理
+        in_pre = name == 'code' and prev_name == 'pre' and prev_end == match.start()
+        prev_name, prev_end = name, match.end()
+        if (mode == 'bare' and not bare) or (mode == 'unstyled' and 'style=' in attrs) or in_pre:
+            continue
+
+        out.append(html_content[pos:match.start()])
+        if mode == 'append':
+            out.append(f'<{name}{attrs.rstrip()} style="{style}">')
+        elif name in VOID_TAGS:
+            out.append(f'<{name} style="{style}" />')
+        else:
+            out.append(f'<{name} style="{style}">')
+        pos = match.end()
+
+    out.append(html_content[pos:])
+    return ''.join(out)
+
+
+def remove_style_blocks(html_content: str) -> str:
+    """删除 <style>...</style>（线性查找，不用 DOTALL 的 .*? 正则）"""
+    out = []
+    pos = 0
+    while True:
+        match = STYLE_OPEN_RE.search(html_content, pos)
+        if not match:
+            break
+        close = html_content.find('</style>', match.end())
+        if close == -1:
+            # 后面没有闭合标签，之后的 <style> 也不可能闭合
+            break
+        out.append(html_content[pos:match.start()])
+        pos = close + 8
+    out.append(html_content[pos:])
+    return ''.join(out)
+
+
+def style_images(html_content: str, style: str = 'max-width:100%;height:auto;') -> str:
+    """为 <img> 追加自适应宽度样式"""
+    return IMG_TAG_RE.sub(lambda m: f'<img{m.group(1).rstrip(" /")} style="{style}" />', html_content)
+
 
 def optimize_wechat_html(html_content: str, title: str = "") -> str:
     """为公众号 HTML 添加内联样式"""
 
-    # 1. 处理 h1 标题
-    html_content = re.sub(
-        r'<h1[^>]*>(.*?)</h1>',
-        r'<h1 style="font-size: 24px; font-weight: 600; margin: 24px 0 16px; color: #1a1a1a; text-align: center; border-bottom: 2px solid #007aff; padding-bottom: 12px;">\1</h1>',
-        html_content
-    )
-
-    # 2. 处理 h2 标题（紫色渐变背景）
-    html_content = re.sub(
-        r'<h2[^>]*>(.*?)</h2>',
-        r'<h2 style="font-size: 20px; font-weight: 600; margin: 24px 0 12px; color: #ffffff; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 8px 16px; border-radius: 4px;">\1</h2>',
-        html_content
-    )
-
-    # 3. 处理 h3 标题
-    html_content = re.sub(
-        r'<h3[^>]*>(.*?)</h3>',
-        r'<h3 style="font-size: 18px; font-weight: 600; margin: 20px 0 10px; color: #333333;">\1</h3>',
-        html_content
-    )
-
-    # 4. 处理普通段落
-    html_content = re.sub(
-        r'<p>(.*?)</p>',
-        r'<p style="margin: 16px 0; line-height: 1.8; color: #333333;">\1</p>',
-        html_content
-    )
-
-    # 5. 处理列表 ul
-    html_content = re.sub(
-        r'<ul[^>]*>',
-        r'<ul style="padding-left: 24px; margin: 16px 0;">',
-        html_content
-    )
-
-    # 6. 处理列表项 li
-    html_content = re.sub(
-        r'<li[^>]*>(.*?)</li>',
-        r'<li style="margin: 8px 0; line-height: 1.7; color: #333333;">\1</li>',
-        html_content
-    )
-
-    # 7. 处理表格
-    html_content = re.sub(
-        r'<table[^>]*>',
-        r'<table style="width: 100%; border-collapse: collapse; margin: 16px 0;">',
-        html_content
-    )
-    html_content = re.sub(
-        r'<thead[^>]*>',
-        r'<thead style="background: #f5f5f5;">',
-        html_content
-    )
-    html_content = re.sub(
-        r'<th([^>]*)>',
-        r'<th\1 style="padding: 10px; border: 1px solid #ddd; text-align: left; font-weight: 600;">',
-        html_content
-    )
-    html_content = re.sub(
-        r'<td([^>]*)>',
-        r'<td\1 style="padding: 10px; border: 1px solid #ddd;">',
-        html_content
-    )
-
-    # 8. 处理引用 blockquote
-    html_content = re.sub(
-        r'<blockquote[^>]*>',
-        r'<blockquote style="border-left: 4px solid #667eea; padding-left: 16px; margin: 16px 0; color: #666666; background: #f9f9f9; padding: 12px 16px;">',
-        html_content
-    )
-
-    # 9. 处理 hr 分割线
-    html_content = re.sub(
-        r'<hr\s*/?>',
-        r'<hr style="border: none; border-top: 1px solid #eeeeee; margin: 24px 0;" />',
-        html_content
-    )
-
-    # 10. 处理 strong/bold
-    html_content = re.sub(
-        r'<strong>(.*?)</strong>',
-        r'<strong style="font-weight: 600; color: #1a1a1a;">\1</strong>',
-        html_content
-    )
-
-    # 11. 处理 code
-    html_content = re.sub(
-        r'<code[^>]*>(.*?)</code>',
-        r'<code style="background: #f5f5f5; padding: 2px 6px; border-radius: 3px; font-family: monospace;">\1</code>',
-        html_content
-    )
-
-    # 12. 处理 pre 代码块
-    html_content = re.sub(
-        r'<pre[^>]*>',
-        r'<pre style="background: #f5f5f5; padding: 12px; border-radius: 4px; overflow-x: auto; margin: 16px 0; font-size: 14px;">',
-        html_content
-    )
+    # 1-12. 标题、段落、列表、表格、引用、分割线、加粗、代码
+    html_content = apply_tag_styles(html_content, WECHAT_TAG_STYLES)
 
     # 13. 移除空的 <br>
     html_content = re.sub(r'<br>\s*<br>', '<br><br>', html_content)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+发布前检查（fail-fast）
+
+功能：在生成文章和封面之前检查所有已知会导致发布失败的条件，问题一次性全部报告
+- 标题 ≤ 32 字、作者 ≤ 8 字、摘要 ≤ 120 字（超出时公众号接口会截断或拒绝）
+- 正文渲染后的大小：文字少于 2 万字、HTML 小于 1 MB
+- 凭据、封面来源等依赖发布流程状态的检查由调用方以函数形式传入
+- 各项检查并发执行，总耗时取决于最慢的一项（通常是获取 access_token）
+
+检查函数返回 [(级别, 说明)]，级别为 ERROR 时中止发布，WARNING 只提示。
+"""
+
+import contextlib
+import io
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from article_digest import DIGEST_MAX_CHARS
+
+ERROR = "❌"
+WARNING = "⚠️"
+
+TITLE_MAX_CHARS = 32
+AUTHOR_MAX_CHARS = 8
+CONTENT_MAX_CHARS = 20000
+CONTENT_MAX_BYTES = 1024 * 1024
+
+HTML_TAG_RE = re.compile(r'<[^<>]*>')
+
+
+def check_title(title: str, hint: str = "") -> list:
+    if not title or not title.strip():
+        return [(ERROR, "标题为空")]
+    if len(title) > TITLE_MAX_CHARS:
+        return [(ERROR, f"「{title}」{len(title)} 字，超过 {TITLE_MAX_CHARS} 字上限{hint}")]
+    return []
+
+
+def check_author(author: str) -> list:
+    if len(author) > AUTHOR_MAX_CHARS:
+        return [(ERROR, f"「{author}」{len(author)} 字，超过 {AUTHOR_MAX_CHARS} 字上限")]
+    return []
+
+
+def check_digest(digest: str) -> list:
+    if len(digest) > DIGEST_MAX_CHARS:
+        return [(ERROR, f"摘要 {len(digest)} 字，超过 {DIGEST_MAX_CHARS} 字上限")]
+    return []
+
+
+def check_rendered_size(html: str) -> list:
+    """正文上限：文字少于 2 万字，HTML（含内联样式）小于 1 MB"""
+    problems = []
+    size = len(html.encode('utf-8'))
+    if size >= CONTENT_MAX_BYTES:
+        problems.append((ERROR, f"渲染后 HTML {size / 1024:.0f} KB，超过 {CONTENT_MAX_BYTES // 1024} KB 上限"))
+    chars = len(HTML_TAG_RE.sub('', html))
+    if chars >= CONTENT_MAX_CHARS:
+        problems.append((ERROR, f"正文约 {chars} 字，超过 {CONTENT_MAX_CHARS} 字上限"))
+    return problems
+
+
+def run_preflight(checks: dict, max_workers: int = 8) -> dict:
+    """并发执行检查 {名称: 函数() -> [(级别, 说明)]}，返回 {名称: [(级别, 说明)]}（保持传入顺序）
+
+    检查过程中的打印输出被屏蔽，问题只通过返回值报告；检查本身抛出的异常记为错误
+    """
+    def call(func):
+        try:
+            return func()
+        except Exception as e:
+            return [(ERROR, f"检查出错: {e}")]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(checks)))) as pool:
+            futures = {name: pool.submit(call, func) for name, func in checks.items()}
+            return {name: future.result() for name, future in futures.items()}
+
+
+def report(results: dict, elapsed: float) -> bool:
+    """打印检查结果，没有错误时返回 True"""
+    errors = sum(1 for problems in results.values() for level, _ in problems if level == ERROR)
+    print(f"🔍 发布前检查：{len(results)} 项，耗时 {elapsed * 1000:.0f} ms")
+    for name, problems in results.items():
+        if not problems:
+            print(f"✅ {name}")
+        for level, message in problems:
+            print(f"{level} {name}: {message}")
+    if errors:
+        print(f"⛔ 发现 {errors} 个问题，已中止发布（尚未调用大模型或生成封面）")
+    return errors == 0
+
+
+def preflight(checks: dict) -> bool:
+    """执行并报告检查，没有错误时返回 True"""
+    start = time.perf_counter()
+    results = run_preflight(checks)
+    return report(results, time.perf_counter() - start)
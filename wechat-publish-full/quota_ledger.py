@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+公众号接口配额台账
+
+功能：跨进程统计每个 AppID 每天各接口的调用次数，并在发布前做准入控制
+- SQLite 存储，多个发布进程共享同一份计数
+- 每个接口可配置每日上限（按北京时间自然日重置）
+- 发布前按计划预留配额，余量不足时在生成文章和封面之前就拒绝/推迟
+- 实际调用计入用量时同一事务内扣减对应的预留，同一次调用不会既算预留又算已用
+- 接口返回 45009（调用次数超限）时，当天该接口直接记为用尽
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+DEFAULT_DB = "/root/.openclaw/workspace/wechat_output/quota.db"
+
+# 各接口默认每日上限，可用 set-limit 子命令或 WECHAT_QUOTA_LIMITS 环境变量覆盖
+# 环境变量格式：token=2000,add_material=1000,draft/add=1000
+DEFAULT_LIMITS = {
+    "token": 2000,
+    "add_material": 1000,
+    "draft/add": 1000,
+    "draft/update": 1000,
+}
+
+# 预留配额的有效期：进程异常退出未释放时，过期后自动失效
+RESERVATION_TTL = 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage (
+    app_id   TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    day      TEXT NOT NULL,
+    count    INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (app_id, endpoint, day)
+);
+CREATE TABLE IF NOT EXISTS limits (
+    app_id      TEXT NOT NULL,
+    endpoint    TEXT NOT NULL,
+    daily_limit INTEGER NOT NULL,
+    PRIMARY KEY (app_id, endpoint)
+);
+CREATE TABLE IF NOT EXISTS reservations (
+    id         TEXT NOT NULL,
+    app_id     TEXT NOT NULL,
+    endpoint   TEXT NOT NULL,
+    day        TEXT NOT NULL,
+    amount     INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+def quota_day(now: float = None) -> str:
+    """配额日（北京时间，公众号每日 0 点重置）"""
+    return time.strftime('%Y-%m-%d', time.gmtime((now or time.time()) + 8 * 3600))
+
+
+def parse_limits(spec: str) -> dict:
+    """解析 endpoint=N,endpoint=N 形式的上限配置"""
+    limits = {}
+    for item in (spec or "").split(","):
+        if "=" in item:
+            endpoint, value = item.split("=", 1)
+            limits[endpoint.strip()] = int(value)
+    return limits
+
+
+class QuotaLedger:
+    """接口配额台账"""
+
+    def __init__(self, db_path=DEFAULT_DB):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(db_path), timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.default_limits = {**DEFAULT_LIMITS, **parse_limits(os.environ.get("WECHAT_QUOTA_LIMITS"))}
+        # 同一连接在多线程间共享（批量模式），事务需串行
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def _transaction(self):
+        """BEGIN IMMEDIATE：多进程下读-判断-写整体串行"""
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def limit(self, app_id: str, endpoint: str) -> int:
+        row = self.conn.execute(
+            "SELECT daily_limit FROM limits WHERE app_id = ? AND endpoint = ?", (app_id, endpoint)
+        ).fetchone()
+        if row:
+            return row[0]
+        return self.default_limits.get(endpoint)
+
+    def set_limit(self, app_id: str, endpoint: str, daily_limit: int):
+        with self._transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO limits VALUES (?, ?, ?)", (app_id, endpoint, daily_limit))
+
+    def _used(self, conn, app_id: str, endpoint: str, day: str) -> int:
+        row = conn.execute(
+            "SELECT count FROM usage WHERE app_id = ? AND endpoint = ? AND day = ?", (app_id, endpoint, day)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _reserved(self, conn, app_id: str, endpoint: str, day: str) -> int:
+        row = conn.execute(
+            "SELECT COALESCE(SUM(amount), 0) FROM reservations "
+            "WHERE app_id = ? AND endpoint = ? AND day = ? AND expires_at > ?",
+            (app_id, endpoint, day, time.time())
+        ).fetchone()
+        return row[0]
+
+    def remaining(self, app_id: str, endpoint: str) -> int:
+        """当日剩余可用次数（已扣除其他进程的预留），无上限时返回 None"""
+        daily_limit = self.limit(app_id, endpoint)
+        if daily_limit is None:
+            return None
+        day = quota_day()
+        with self._transaction() as conn:
+            return daily_limit - self._used(conn, app_id, endpoint, day) - self._reserved(conn, app_id, endpoint, day)
+
+    def record(self, app_id: str, endpoint: str, count: int = 1, reservation_id: str = None):
+        """记录一次实际调用；给出预留 ID 时，同一事务内把该接口的预留转为已用"""
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO usage VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(app_id, endpoint, day) DO UPDATE SET count = count + excluded.count",
+                (app_id, endpoint, quota_day(), count)
+            )
+            if reservation_id:
+                conn.execute("UPDATE reservations SET amount = amount - ? WHERE id = ? AND endpoint = ?",
+                             (count, reservation_id, endpoint))
+                conn.execute("DELETE FROM reservations WHERE id = ? AND endpoint = ? AND amount <= 0",
+                             (reservation_id, endpoint))
+
+    def mark_exhausted(self, app_id: str, endpoint: str):
+        """接口返回调用超限时，把当日用量记满"""
+        daily_limit = self.limit(app_id, endpoint) or 0
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO usage VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(app_id, endpoint, day) DO UPDATE SET count = MAX(count, excluded.count)",
+                (app_id, endpoint, quota_day(), daily_limit)
+            )
+
+    def reserve(self, app_id: str, plan: dict, reservation_id: str = None):
+        """按计划 {endpoint: 次数} 预留配额
+
+        全部满足时返回 (预留 ID, {})；任一接口不足时不预留，返回 (None, {endpoint: 剩余次数})。
+        给出 reservation_id 时在已有预留上追加（release 时一并释放）
+        """
+        day = quota_day()
+        reservation_id = reservation_id or uuid.uuid4().hex
+        short = {}
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM reservations WHERE expires_at <= ?", (time.time(),))
+            for endpoint, amount in plan.items():
+                daily_limit = self.limit(app_id, endpoint)
+                if daily_limit is None or amount <= 0:
+                    continue
+                left = daily_limit - self._used(conn, app_id, endpoint, day) - self._reserved(conn, app_id, endpoint, day)
+                if left < amount:
+                    short[endpoint] = left
+            if short:
+                return None, short
+            expires_at = time.time() + RESERVATION_TTL
+            conn.executemany(
+                "INSERT INTO reservations VALUES (?, ?, ?, ?, ?, ?)",
+                [(reservation_id, app_id, endpoint, day, amount, expires_at)
+                 for endpoint, amount in plan.items() if amount > 0]
+            )
+        return reservation_id, {}
+
+    def release(self, reservation_id: str):
+        """释放预留的剩余部分（已发生的调用在 record 时已从预留转为已用）"""
+        if reservation_id:
+            with self._transaction() as conn:
+                conn.execute("DELETE FROM reservations WHERE id = ?", (reservation_id,))
+
+    def status(self, app_id: str) -> list:
+        """当日各接口的用量、预留与上限"""
+        day = quota_day()
+        endpoints = set(self.default_limits)
+        endpoints.update(r[0] for r in self.conn.execute("SELECT endpoint FROM limits WHERE app_id = ?", (app_id,)))
+        endpoints.update(r[0] for r in self.conn.execute(
+            "SELECT endpoint FROM usage WHERE app_id = ? AND day = ?", (app_id, day)))
+        rows = []
+        for endpoint in sorted(endpoints):
+            used = self._used(self.conn, app_id, endpoint, day)
+            reserved = self._reserved(self.conn, app_id, endpoint, day)
+            rows.append({"endpoint": endpoint, "used": used, "reserved": reserved,
+                         "limit": self.limit(app_id, endpoint)})
+        return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='公众号接口配额台账')
+    parser.add_argument('--db', default=DEFAULT_DB, help=f'台账数据库路径（默认 {DEFAULT_DB}）')
+    parser.add_argument('--app-id', required=True, help='微信公众号 AppID')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_status = sub.add_parser('status', help='查看当日配额使用情况')
+    p_status.add_argument('--json', action='store_true', help='输出 JSON 格式')
+
+    p_limit = sub.add_parser('set-limit', help='设置接口每日上限')
+    p_limit.add_argument('endpoint', help='接口名，如 token / add_material / draft/add / draft/update')
+    p_limit.add_argument('daily_limit', type=int, help='每日上限')
+
+    args = parser.parse_args()
+    ledger = QuotaLedger(args.db)
+
+    if args.command == 'status':
+        rows = ledger.status(args.app_id)
+        if args.json:
+            print(json.dumps({"day": quota_day(), "endpoints": rows}, ensure_ascii=False, indent=2))
+            return
+        print(f"📊 {quota_day()} 配额使用情况")
+        for row in rows:
+            limit = row['limit'] if row['limit'] is not None else '∞'
+            print(f"{row['endpoint']}\t已用 {row['used']}\t预留 {row['reserved']}\t上限 {limit}")
+    elif args.command == 'set-limit':
+        if args.daily_limit < 0:
+            print("❌ 上限不能为负数")
+            sys.exit(1)
+        ledger.set_limit(args.app_id, args.endpoint, args.daily_limit)
+        print(f"✅ 已设置 {args.endpoint} 每日上限: {args.daily_limit}")
+
+
+if __name__ == "__main__":
+    main()
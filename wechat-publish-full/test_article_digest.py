@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""article_digest 回归测试：列表、小标题和重复句不应拼进摘要"""
+
+from article_digest import DIGEST_MAX_CHARS, split_sentences, summarize
+
+ARTICLE = """---
+title: 智能体架构
+---
+
+# 智能体架构拆解
+
+智能体把大模型、记忆和工具组合在一起完成任务。
+
+## 核心模块
+
+- 规划模块拆解复杂任务
+- 记忆模块保存上下文
+- 工具模块调用外部接口
+
+智能体把大模型、记忆和工具组合在一起完成任务。
+智能体把大模型、记忆与工具组合在一起来完成任务！
+规划决定了智能体能否处理多步骤的问题，是整体效果的关键。
+没有句末标点的一行说明文字
+"""
+
+
+def test_summary_skips_list_fragments_and_duplicates():
+    digest = summarize(ARTICLE)
+    assert digest
+    assert len(digest) <= DIGEST_MAX_CHARS
+    assert '拆解复杂任务' not in digest
+    assert '记忆模块保存' not in digest
+    assert digest.count('组合在一起') == 1
+
+
+def test_unpunctuated_fragment_gets_period():
+    sentences = split_sentences("第一行说明文字没有标点\n第二句已经有标点了。\n第二句已经有标点了。")
+    assert sentences == ['第一行说明文字没有标点。', '第二句已经有标点了。']
+
+
+def test_numpy_and_python_paths_agree():
+    import article_digest
+    if not article_digest.HAS_NUMPY:
+        return
+    content = '\n'.join(f"第{i}段讨论了{topic}相关的实现细节和取舍。"
+                        for i, topic in enumerate(['缓存', '并发', '缓存', '限流', '并发', '存储']))
+    try:
+        with_numpy = summarize(content + ARTICLE)
+        article_digest.HAS_NUMPY = False
+        pure_python = summarize(content + ARTICLE)
+    finally:
+        article_digest.HAS_NUMPY = True
+    assert with_numpy == pure_python
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""quota_ledger 回归测试：追加预留计入同一预留 ID，实际调用转为已用，release 释放剩余部分"""
+
+from quota_ledger import QuotaLedger
+
+
+def test_reserve_appends_to_existing_reservation(tmp_path):
+    quota = QuotaLedger(tmp_path / "quota.db")
+    quota.set_limit("app", "add_material", 1)
+    quota.set_limit("app", "draft/update", 5)
+
+    reservation, short = quota.reserve("app", {"add_material": 0, "draft/update": 1})
+    assert reservation and not short
+    assert quota.remaining("app", "add_material") == 1
+
+    assert quota.reserve("app", {"add_material": 1}, reservation_id=reservation) == (reservation, {})
+    assert quota.remaining("app", "add_material") == 0
+    assert quota.reserve("app", {"add_material": 1}) == (None, {"add_material": 0})
+
+    quota.record("app", "add_material", reservation_id=reservation)
+    assert quota.remaining("app", "add_material") == 0
+    quota.release(reservation)
+    assert quota.remaining("app", "add_material") == 0
+    assert quota.remaining("app", "draft/update") == 5